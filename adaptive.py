@@ -0,0 +1,110 @@
+"""
+Elo-style ratings for adaptive question selection.
+Every graded answer is a match between a user and a question: a correct
+answer moves the user's rating up and the question's rating down, an
+incorrect one the other way round. Selection picks the questions whose
+rating is closest to the difficulty at which the user is expected to answer
+correctly TARGET_SUCCESS of the time.
+"""
+
+import bisect
+import math
+import random
+import time
+from array import array
+
+INITIAL_RATING = 1500.0
+SCALE = 400.0
+TARGET_SUCCESS = 0.7
+NEAR_RATING = 25.0  # Questions this close to the last one needed are picked from at random
+
+
+def expected_success(user_rating, question_rating):
+    """Probability that the user answers the question correctly"""
+    return 1.0 / (1.0 + 10 ** ((question_rating - user_rating) / SCALE))
+
+
+def k_factor(answer_count, initial=64.0, floor=16.0):
+    """Large steps while a rating is new, smaller ones once it has settled"""
+    return max(floor, initial / math.sqrt(1 + answer_count))
+
+
+def elo_update(user_rating, user_answers, question_rating, question_answers, correct):
+    """Return the (user_rating, question_rating) pair after one graded answer"""
+    surprise = (1.0 if correct else 0.0) - expected_success(user_rating, question_rating)
+    return (
+        user_rating + k_factor(user_answers) * surprise,
+        question_rating - k_factor(question_answers) * surprise,
+    )
+
+
+def target_rating(user_rating, success=TARGET_SUCCESS):
+    """Question rating at which the user's expected success equals `success`"""
+    return user_rating + SCALE * math.log10(1.0 / success - 1.0)
+
+
+class QuizRatingModel:
+    """Question ratings of one quiz in compact arrays, for fast selection"""
+
+    def __init__(self, question_ids, ratings, loaded_at=None):
+        self.question_ids = array('q', question_ids)
+        self.ratings = array('d', ratings)
+        self.position = {question_id: i for i, question_id in enumerate(self.question_ids)}
+        self.loaded_at = loaded_at if loaded_at is not None else time.monotonic()
+        # (positions sorted by rating, ratings in that order), rebuilt lazily after
+        # updates; replaced as one tuple so concurrent selects never see half of it
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def update(self, question_id, rating):
+        position = self.position.get(question_id)
+        if position is not None:
+            self.ratings[position] = rating
+            self._sorted = None
+
+    def _ensure_sorted(self):
+        """The current (order, sorted ratings) pair; callers use only the returned copies"""
+        sorted_pair = self._sorted
+        if sorted_pair is None:
+            ratings = array('d', self.ratings)  # Snapshot, so updates cannot reorder it mid-sort
+            order = sorted(range(len(ratings)), key=ratings.__getitem__)
+            sorted_pair = (order, array('d', (ratings[i] for i in order)))
+            self._sorted = sorted_pair
+        return sorted_pair
+
+    def select(self, user_rating, count, exclude=frozenset(), rng=random):
+        """
+        Ids of `count` questions close to the user's target difficulty, in
+        random order. Every question no further from the target than the
+        count-th closest plus NEAR_RATING is equally likely, so users at the
+        same level (e.g. new users, where all ratings are equal) do not all
+        get the same batch. Ids in `exclude` are skipped.
+        """
+        order, sorted_ratings = self._ensure_sorted()
+        target = target_rating(user_rating)
+        right = bisect.bisect_left(sorted_ratings, target)
+        left = right - 1
+        n = len(sorted_ratings)
+        candidates = []
+        limit = None  # Largest distance still taken, once `count` candidates are found
+
+        # Grow a window around the target, taking the closer side each step
+        while left >= 0 or right < n:
+            if right >= n or (left >= 0 and target - sorted_ratings[left] <= sorted_ratings[right] - target):
+                i, distance = left, target - sorted_ratings[left]
+                left -= 1
+            else:
+                i, distance = right, sorted_ratings[right] - target
+                right += 1
+            if limit is not None and distance > limit:
+                break
+            question_id = self.question_ids[order[i]]
+            if question_id in exclude:
+                continue
+            candidates.append(question_id)
+            if len(candidates) == count:
+                limit = distance + NEAR_RATING
+
+        return rng.sample(candidates, min(count, len(candidates)))
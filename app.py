@@ -1,24 +1,51 @@
-from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for, flash, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 import json
 import random
 import csv
+import zlib
+import time
+import hashlib
+import re
+import atexit
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from question_dedup import NearDuplicateIndex, normalize_text, DEFAULT_THRESHOLD as DUPLICATE_THRESHOLD
+from leaderboard import RankedBoard
+from adaptive import INITIAL_RATING, QuizRatingModel, elo_update
+from page_cache import PageCache, text_hole, json_hole
+from phone_lookup import BloomFilter, normalize_phone, DEFAULT_COUNTRY_CODE
+from profiling import init_profiling
+from question_bundle import QuestionBundle, write_bundle
+from group_commit import GroupCommitQueue
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz_app.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('QUIZ_DATABASE_URI', 'sqlite:///quiz_app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['PAGE_CACHE_ENABLED'] = os.environ.get('QUIZ_PAGE_CACHE', '1') != '0'
+app.config['GROUP_COMMIT_ENABLED'] = os.environ.get('QUIZ_GROUP_COMMIT', '0') == '1'
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 CSV_FOLDER = 'csv_files'
 TEMP_FOLDER = 'temp_quiz_data'
 ALLOWED_EXTENSIONS = {'docx'}
+DEFAULT_LANGUAGE = 'en'  # Language of the text stored on Question itself
+SUPPORTED_LANGUAGES = ('en', 'ro')
+# Country code assumed for numbers entered without one
+PHONE_COUNTRY_CODE = os.environ.get('QUIZ_PHONE_COUNTRY_CODE', DEFAULT_COUNTRY_CODE)
+# Comma-separated phone numbers of users allowed to use the admin exports
+ADMIN_PHONE_NUMBERS = {
+    normalize_phone(phone, PHONE_COUNTRY_CODE) for phone in os.environ.get('QUIZ_ADMIN_PHONES', '').split(',')
+} - {None}
 
 # Create necessary directories
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -36,6 +63,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(20), unique=True, nullable=False)
+    phone_e164 = db.Column(db.String(16), unique=True, index=True, nullable=True)  # Canonical lookup key
     email = db.Column(db.String(120), unique=True, nullable=True)  # Optional
     password_hash = db.Column(db.String(200), nullable=True)  # Optional
     language = db.Column(db.String(5), default='en')  # 'en' or 'ro'
@@ -59,6 +87,10 @@ class User(UserMixin, db.Model):
         """Check if user has set a password"""
         return self.password_hash is not None
     
+    def is_admin(self):
+        """Check if user is listed in QUIZ_ADMIN_PHONES"""
+        return self.phone_e164 in ADMIN_PHONE_NUMBERS
+    
     def has_access(self):
         """Check if user has access (trial or paid)"""
         if self.is_paid:
@@ -95,6 +127,39 @@ class Question(db.Model):
     option_e = db.Column(db.Text, nullable=True)
     correct_answers = db.Column(db.String(50), nullable=False)  # e.g., "A" or "A,B,C"
     order_num = db.Column(db.Integer, default=0)
+    translations = db.relationship('QuestionTranslation', backref='question', lazy=True, cascade='all, delete-orphan')
+
+QUESTION_TEXT_FIELDS = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'option_e']
+
+class QuestionTranslation(db.Model):
+    """Question and option text in a language other than DEFAULT_LANGUAGE"""
+    __table_args__ = (db.UniqueConstraint('question_id', 'language'),)
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
+    language = db.Column(db.String(5), nullable=False)
+    question_text = db.Column(db.Text, nullable=True)  # Empty fields fall back to the Question text
+    option_a = db.Column(db.Text, nullable=True)
+    option_b = db.Column(db.Text, nullable=True)
+    option_c = db.Column(db.Text, nullable=True)
+    option_d = db.Column(db.Text, nullable=True)
+    option_e = db.Column(db.Text, nullable=True)
+
+class CatalogVersion(db.Model):
+    """Single row, bumped on every import so compiled payloads can be invalidated"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class QuizPayload(db.Model):
+    """Compiled question list of a quiz in one language, as served by get_quiz_data"""
+    __table_args__ = (db.UniqueConstraint('quiz_id', 'language'),)
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    language = db.Column(db.String(5), nullable=False)
+    catalog_version = db.Column(db.Integer, nullable=False)
+    changed_version = db.Column(db.Integer, nullable=False, default=0)  # Catalog version of the last content change
+    content_hash = db.Column(db.String(40), nullable=True)
+    payload = db.Column(db.Text, nullable=False)  # JSON list, questions in order_num order
 
 class QuizProgress(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -105,31 +170,535 @@ class QuizProgress(db.Model):
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
     quiz_ref = db.relationship('Quiz', backref='progress', lazy=True)
 
+class UserQuizSummary(db.Model):
+    """One row per (user, quiz), kept up to date on every submit_quiz"""
+    __table_args__ = (db.UniqueConstraint('user_id', 'quiz_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    best_score = db.Column(db.Integer, default=0)
+    last_score = db.Column(db.Integer, default=0)
+    last_total = db.Column(db.Integer, default=0)
+    attempt_count = db.Column(db.Integer, default=0)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
+class QuizProgressArchive(db.Model):
+    """Compressed chunk of QuizProgress rows moved out of the hot table"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    attempt_count = db.Column(db.Integer, default=0)
+    first_completed_at = db.Column(db.DateTime, nullable=True)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON list of attempts
+
+    def attempts(self):
+        """Decompress the archived attempts"""
+        return json.loads(zlib.decompress(self.payload).decode('utf-8'))
+
+class LeaderboardEntry(db.Model):
+    """
+    Materialized leaderboard score of one user on one board.
+    Quiz boards hold the user's best percentage on that quiz; category boards
+    hold the sum of the user's best percentages over the category's quizzes.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('board_type', 'board_key', 'period', 'user_id'),
+        db.Index('ix_leaderboard_entry_rank', 'board_type', 'board_key', 'period', 'score'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    board_type = db.Column(db.String(10), nullable=False)  # 'quiz' or 'category'
+    board_key = db.Column(db.String(100), nullable=False)  # quiz id or category name
+    period = db.Column(db.String(10), nullable=False)  # 'all' or ISO week, e.g. '2026-W42'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    score = db.Column(db.Integer, default=0)
+
+class LeaderboardGeneration(db.Model):
+    """Single row, bumped by every full rebuild so each worker reloads its ranked boards"""
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class QuestionRating(db.Model):
+    """Elo-style difficulty of a question, learned from graded answers"""
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), primary_key=True)
+    rating = db.Column(db.Float, default=INITIAL_RATING)
+    answer_count = db.Column(db.Integer, default=0)
+
+class AnsweredQuestion(db.Model):
+    """When a user last answered a question in adaptive practice, so it is not served again right away"""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'question_id'),
+        db.Index('ix_answered_question_recent', 'user_id', 'quiz_id', 'answered_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    answered_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UserMastery(db.Model):
+    """Elo-style mastery of a user on one quiz"""
+    __table_args__ = (db.UniqueConstraint('user_id', 'quiz_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    rating = db.Column(db.Float, default=INITIAL_RATING)
+    answer_count = db.Column(db.Integer, default=0)
+
+class QuizSession(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    question_filter = db.Column(db.String(20), default='all')  # all, single, multiple
+    seed = db.Column(db.Integer, nullable=False)  # Shuffle seed - the order is re-derived, never stored
+    cursor = db.Column(db.Integer, default=0)  # Index of the next unanswered question
+    score = db.Column(db.Integer, default=0)
+    total_questions = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'quiz_id': self.quiz_id,
+            'filter': self.question_filter,
+            'cursor': self.cursor,
+            'score': self.score,
+            'total_questions': self.total_questions,
+            'completed': self.completed_at is not None
+        }
+
+class OfflineAttempt(db.Model):
+    """Client id of an attempt recorded by /submit_quiz or /offline/sync, so a retried attempt is counted once"""
+    __table_args__ = (db.UniqueConstraint('user_id', 'client_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    client_id = db.Column(db.String(64), nullable=False)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def get_question_counts():
+    """Return {quiz_id: question count} in a single grouped query"""
+    return dict(
+        db.session.query(Question.quiz_id, db.func.count(Question.id))
+        .group_by(Question.quiz_id)
+        .all()
+    )
+
+def question_type_counts_statement(quiz_id):
+    """SELECT (total, multiple-answer) question counts of a quiz (shared with the async app)"""
+    return db.select(
+        db.func.count(Question.id),
+        db.func.coalesce(db.func.sum(db.case((Question.correct_answers.contains(','), 1), else_=0)), 0)
+    ).where(Question.quiz_id == quiz_id)
+
+def get_quiz_summaries(user_id):
+    """Return {quiz_id: UserQuizSummary} for a user"""
+    return {summary.quiz_id: summary for summary in UserQuizSummary.query.filter_by(user_id=user_id).all()}
+
+def logged_attempts_statement(user_id, quiz_id):
+    """SELECT (score, total, completed_at) of a user's logged attempts on a quiz, latest first (shared with the async app)"""
+    return db.select(QuizProgress.score, QuizProgress.total_questions, QuizProgress.completed_at).where(
+        QuizProgress.user_id == user_id, QuizProgress.quiz_id == quiz_id
+    ).order_by(QuizProgress.completed_at.desc(), QuizProgress.id.desc())
+
+def new_quiz_summary(user_id, quiz_id, logged_attempts):
+    """
+    Unsaved summary seeded with the attempts logged before it existed (shared
+    with the async app), so a user's first submission after the upgrade does
+    not start their history from zero.
+    """
+    summary = UserQuizSummary(user_id=user_id, quiz_id=quiz_id, best_score=0, attempt_count=len(logged_attempts))
+    if logged_attempts:
+        summary.best_score = max(attempt_score or 0 for attempt_score, _, _ in logged_attempts)
+        summary.last_score, summary.last_total, summary.last_completed_at = logged_attempts[0]
+    return summary
+
+def update_quiz_summary(user_id, quiz_id, score, total, completed_at):
+    """
+    Fold one attempt into the user's summary for that quiz (caller commits).
+    Call it before adding the attempt's QuizProgress row, which a missing
+    summary is seeded from.
+    """
+    summary = UserQuizSummary.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
+    if not summary:
+        summary = new_quiz_summary(user_id, quiz_id, db.session.execute(logged_attempts_statement(user_id, quiz_id)).all())
+        db.session.add(summary)
+    
+    return apply_attempt_to_summary(summary, score, total, completed_at)
+
+def valid_client_id(client_id):
+    """Whether a client-generated attempt id can be stored (shared with the async app)"""
+    return isinstance(client_id, str) and 0 < len(client_id) <= 64
+
+def valid_attempt(quiz_id, score, total):
+    """Whether a client-reported attempt can be stored: integers with 0 <= score <= total and total > 0 (shared with the async app)"""
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (quiz_id, score, total)):
+        return False
+    return total > 0 and 0 <= score <= total
+
+def attempt_percentage(score, total):
+    return int(score * 100 / total) if total else 0
+
+def week_period(moment):
+    """ISO week key of a datetime, e.g. '2026-W42'"""
+    year, week, _ = moment.isocalendar()
+    return f'{year}-W{week:02d}'
+
+def leaderboard_periods(completed_at):
+    return ['all', week_period(completed_at)]
+
+def apply_leaderboard_attempt(quiz_entry, category_entry, percentage):
+    """
+    Raise a quiz board entry to a new best percentage and add the gain to the
+    category entry (shared with the async app). Returns True when anything changed.
+    """
+    gain = percentage - (quiz_entry.score or 0)
+    if gain <= 0:
+        return False
+    quiz_entry.score = percentage
+    if category_entry is not None:
+        category_entry.score = (category_entry.score or 0) + gain
+    return True
+
+def get_leaderboard_entry(board_type, board_key, period, user_id):
+    """Load or create (unsaved) a user's entry on a board"""
+    entry = LeaderboardEntry.query.filter_by(
+        board_type=board_type, board_key=board_key, period=period, user_id=user_id
+    ).first()
+    if not entry:
+        entry = LeaderboardEntry(board_type=board_type, board_key=board_key, period=period, user_id=user_id, score=0)
+        db.session.add(entry)
+    return entry
+
+def update_leaderboards(user_id, quiz_id, score, total, completed_at):
+    """
+    Fold one attempt into the quiz and category boards (caller commits).
+    Returns the changed entries as (board_type, board_key, period, user_id, score).
+    """
+    quiz = db.session.get(Quiz, quiz_id)
+    if not quiz:
+        return []
+    
+    percentage = attempt_percentage(score, total)
+    changed = []
+    for period in leaderboard_periods(completed_at):
+        quiz_entry = get_leaderboard_entry('quiz', str(quiz.id), period, user_id)
+        category_entry = get_leaderboard_entry('category', quiz.category, period, user_id) if quiz.category else None
+        if apply_leaderboard_attempt(quiz_entry, category_entry, percentage):
+            changed.extend(
+                (entry.board_type, entry.board_key, entry.period, entry.user_id, entry.score)
+                for entry in (quiz_entry, category_entry) if entry is not None
+            )
+    return changed
+
+# Per-worker ranked boards: {(board_type, board_key, period): RankedBoard}.
+# A board is loaded from the database the first time it is asked for and then
+# stays resident; it is only ever changed through refresh_cached_boards, with
+# this worker's committed changes and with the changes behind attempts other
+# processes logged (found by QuizProgress id, which only grows). A full
+# rebuild bumps the generation in the database, and every worker then drops
+# its boards and loads them again
+_leaderboard_cache = {}
+_leaderboard_sync = {'max_progress_id': 0, 'generation': None}
+
+def get_leaderboard_generation():
+    """Current leaderboard generation (0 before the first rebuild)"""
+    row = db.session.get(LeaderboardGeneration, 1)
+    return row.generation if row else 0
+
+def bump_leaderboard_generation():
+    """Mark every worker's ranked boards as stale after a full rebuild"""
+    row = db.session.get(LeaderboardGeneration, 1)
+    if not row:
+        row = LeaderboardGeneration(id=1, generation=0)
+        db.session.add(row)
+    row.generation += 1
+    db.session.commit()
+    return row.generation
+
+def get_ranked_board(board_type, board_key, period):
+    generation = get_leaderboard_generation()
+    if generation != _leaderboard_sync['generation']:
+        _leaderboard_cache.clear()
+        _leaderboard_sync['generation'] = generation
+    cache_key = (board_type, board_key, period)
+    board = _leaderboard_cache.get(cache_key)
+    if board is None:
+        if not _leaderboard_cache:
+            # Read before the board, so nothing committed in between is missed
+            _leaderboard_sync['max_progress_id'] = db.session.query(db.func.max(QuizProgress.id)).scalar() or 0
+        rows = db.session.query(LeaderboardEntry.user_id, LeaderboardEntry.score).filter_by(
+            board_type=board_type, board_key=board_key, period=period
+        )
+        board = RankedBoard(rows)
+        _leaderboard_cache[cache_key] = board
+    else:
+        sync_cached_boards()
+    return board
+
+def sync_cached_boards():
+    """Apply the board entries changed by attempts logged since the last sync (by any process)"""
+    attempts = db.session.query(QuizProgress.id, QuizProgress.user_id, QuizProgress.quiz_id).filter(
+        QuizProgress.id > _leaderboard_sync['max_progress_id']
+    ).all()
+    if not attempts:
+        return
+    _leaderboard_sync['max_progress_id'] = max(progress_id for progress_id, _, _ in attempts)
+    
+    user_ids = {user_id for _, user_id, _ in attempts}
+    quiz_ids = {quiz_id for _, _, quiz_id in attempts}
+    board_keys = {str(quiz_id) for quiz_id in quiz_ids} | {
+        category for (category,) in db.session.query(Quiz.category).filter(Quiz.id.in_(quiz_ids)) if category
+    }
+    entries = db.session.query(
+        LeaderboardEntry.board_type, LeaderboardEntry.board_key, LeaderboardEntry.period,
+        LeaderboardEntry.user_id, LeaderboardEntry.score
+    ).filter(LeaderboardEntry.user_id.in_(user_ids), LeaderboardEntry.board_key.in_(board_keys))
+    refresh_cached_boards(entries)
+
+def refresh_cached_boards(changes):
+    """Apply committed entry changes (as returned by update_leaderboards) to the boards this worker has loaded"""
+    for board_type, board_key, period, user_id, score in changes:
+        board = _leaderboard_cache.get((board_type, board_key, period))
+        if board is not None:
+            board.update(user_id, score)
+
+# Write-behind group commit (QUIZ_GROUP_COMMIT=1): small writes from request
+# threads are applied and committed in shared transactions by one flusher
+# thread per worker; requests still wait until their write has committed, for
+# at most GROUP_COMMIT_TIMEOUT seconds
+GROUP_COMMIT_TIMEOUT = float(os.environ.get('QUIZ_GROUP_COMMIT_TIMEOUT', 10))
+
+class WriteNotConfirmed(Exception):
+    """A queued write was not acknowledged in time; it may still commit"""
+
+@app.errorhandler(WriteNotConfirmed)
+def write_not_confirmed(error):
+    # A 5xx makes the quiz page replay the attempt under the same client id,
+    # which is counted once even if the first write commits after all
+    return jsonify({'error': 'Write not confirmed, try again'}), 503
+
+@contextmanager
+def group_commit_transaction():
+    """Session of the flusher thread, rolled back if the batch fails"""
+    with app.app_context():
+        try:
+            yield db.session
+        except Exception:
+            db.session.rollback()
+            raise
+
+group_commit_queue = GroupCommitQueue(
+    group_commit_transaction,
+    max_batch=int(os.environ.get('QUIZ_GROUP_COMMIT_BATCH', 64)),
+    max_delay=float(os.environ.get('QUIZ_GROUP_COMMIT_DELAY_MS', 5)) / 1000
+)
+atexit.register(group_commit_queue.drain)
+
+def run_write(write, *args):
+    """
+    Apply write(*args) and commit it, through the group commit queue when
+    enabled. Returns the write's result once it is durable.
+    """
+    if not app.config['GROUP_COMMIT_ENABLED']:
+        result = write(*args)
+        db.session.commit()
+        return result
+    # End this request's read transaction first: on SQLite its shared lock
+    # would keep the flusher from committing while we wait for it. Loaded
+    # objects are expired, so they reload with the committed values
+    db.session.rollback()
+    # The flusher is (re)started if this process has none alive, e.g. after a
+    # fork; if it cannot be, the write is applied directly
+    if not group_commit_queue.start():
+        result = write(*args)
+        db.session.commit()
+        return result
+    future = group_commit_queue.submit(write, *args)
+    try:
+        return future.result(timeout=GROUP_COMMIT_TIMEOUT)
+    except FutureTimeoutError:
+        raise WriteNotConfirmed() from None
+
+def update_user_fields(user_id, fields):
+    """Set columns of one user (a run_write write)"""
+    user = db.session.get(User, user_id)
+    for name, value in fields.items():
+        setattr(user, name, value)
+
+def record_quiz_submission(user_id, quiz_id, score, total, session_id, completed_at, client_id=None):
+    """
+    Store a finished attempt with its summary, leaderboard and session updates
+    (a run_write write). Returns the changed leaderboard entries, or None when
+    an attempt with the same client id was already recorded.
+    """
+    if client_id is not None:
+        if OfflineAttempt.query.filter_by(user_id=user_id, client_id=client_id).first():
+            return None
+        db.session.add(OfflineAttempt(user_id=user_id, client_id=client_id, synced_at=completed_at))
+    update_quiz_summary(user_id, quiz_id, score, total, completed_at)
+    db.session.add(QuizProgress(
+        user_id=user_id,
+        quiz_id=quiz_id,
+        score=score,
+        total_questions=total,
+        completed_at=completed_at
+    ))
+    leaderboard_changes = update_leaderboards(user_id, quiz_id, score, total, completed_at)
+    
+    if session_id:
+        quiz_session = QuizSession.query.filter_by(id=session_id, user_id=user_id).first()
+        if quiz_session and not quiz_session.completed_at:
+            quiz_session.cursor = quiz_session.total_questions
+            quiz_session.score = score
+            quiz_session.completed_at = completed_at
+    
+    return leaderboard_changes
+
+def apply_attempt_to_summary(summary, score, total, completed_at):
+    """Update summary fields for one new attempt (shared with the async app)"""
+    summary.best_score = max(summary.best_score or 0, score)
+    summary.attempt_count = (summary.attempt_count or 0) + 1
+    if summary.last_completed_at is None or completed_at >= summary.last_completed_at:
+        summary.last_score = score
+        summary.last_total = total
+        summary.last_completed_at = completed_at
+    return summary
+
+# Page cache: pages are rendered once per (template, language, catalog version,
+# overlay) as shells with holes for the per-user values, which are filled in
+# on each request
+page_cache = PageCache(json_dumps=app.json.dumps)
+
+class ShellUser:
+    """Stand-in for current_user while rendering a shell; per-user text becomes holes"""
+    is_authenticated = True
+    
+    def __init__(self, user):
+        self.is_paid = user.is_paid
+        self.language = user.language
+        self.name = text_hole('user_name')
+        self.phone_number = text_hole('user_phone')
+        self.email = text_hole('user_email')
+        self._trial_expired = user.get_trial_days_left() == 0
+        self._has_password = user.has_password()
+    
+    def get_trial_days_left(self):
+        # An expired trial changes the markup, so it is rendered as is (and is part of the overlay)
+        return 0 if self._trial_expired else text_hole('trial_days_left')
+    
+    def has_password(self):
+        return self._has_password
+
+def user_overlay(user):
+    """Per-user state that changes a page's markup rather than just its text"""
+    return (user.is_paid, user.get_trial_days_left() == 0, user.has_password())
+
+def user_hole_values(user):
+    return {
+        'user_name': user.name,
+        'user_phone': user.phone_number,
+        'user_email': user.email or '',
+        'trial_days_left': user.get_trial_days_left()
+    }
+
+def render_cached_page(template, holes=None, json_holes=None, **context):
+    """
+    Render a template through the page cache.
+    `context` must be the same for every user with the same overlay; per-user
+    values go in `holes` (escaped text) and `json_holes` (rendered with |tojson).
+    Pages with pending flash messages, and debug mode, bypass the cache.
+    """
+    holes = holes or {}
+    json_holes = json_holes or {}
+    if not app.config['PAGE_CACHE_ENABLED'] or app.debug or session.get('_flashes'):
+        return render_template(template, **context, **holes, **json_holes)
+    
+    values = dict(holes, **json_holes)
+    if current_user.is_authenticated:
+        language = current_user.language
+        overlay = user_overlay(current_user)
+        values.update(user_hole_values(current_user))
+    else:
+        language = DEFAULT_LANGUAGE
+        overlay = ()
+    key = (template, language, get_cached_catalog_version(), overlay, tuple(sorted(context.items())))
+    
+    parts = page_cache.get(key)
+    if parts is None:
+        shell_context = dict(context)
+        shell_context.update({name: text_hole(name) for name in holes})
+        shell_context.update({name: json_hole(name) for name in json_holes})
+        if current_user.is_authenticated:
+            shell_context['current_user'] = ShellUser(current_user)
+        parts = page_cache.put(key, render_template(template, **shell_context))
+    return page_cache.fill(parts, values)
+
 # Routes
 @app.route('/')
 def index():
     """Landing page - show landing or redirect to main menu if logged in"""
     if current_user.is_authenticated:
         return redirect(url_for('main_menu'))
-    return render_template('index.html')
+    return render_cached_page('index.html')
 
 @app.route('/onboarding')
 def onboarding():
     """Onboarding flow - shown before registration"""
     if current_user.is_authenticated:
         return redirect(url_for('main_menu'))
-    return render_template('onboarding.html')
+    return render_cached_page('onboarding.html')
+
+# Registered numbers: a per-worker Bloom filter built on first use, topped up
+# with users registered since (by id) at most every PHONE_FILTER_REFRESH seconds
+# and immediately with registrations served by this worker
+PHONE_FILTER_REFRESH = 2  # seconds
+PHONE_FILTER_ERROR_RATE = 0.01
+PHONE_FILTER_BATCH_SIZE = 5000  # Numbers fetched per round trip while building
+_phone_filter = {'filter': None, 'max_user_id': 0, 'refreshed_at': 0.0}
+
+def build_phone_filter():
+    """Bloom filter of every registered number, with room for twice as many"""
+    count, max_user_id = db.session.query(db.func.count(User.id), db.func.max(User.id)).one()
+    phone_filter = BloomFilter(max(10000, 2 * count), PHONE_FILTER_ERROR_RATE)
+    for (phone,) in db.session.query(User.phone_e164).filter(User.phone_e164.isnot(None)).yield_per(PHONE_FILTER_BATCH_SIZE):
+        phone_filter.add(phone)
+    _phone_filter.update(filter=phone_filter, max_user_id=max_user_id or 0, refreshed_at=time.monotonic())
+    return phone_filter
+
+def get_phone_filter():
+    phone_filter = _phone_filter['filter']
+    if phone_filter is None or phone_filter.count > phone_filter.capacity:
+        return build_phone_filter()
+    if time.monotonic() - _phone_filter['refreshed_at'] > PHONE_FILTER_REFRESH:
+        rows = db.session.query(User.id, User.phone_e164).filter(User.id > _phone_filter['max_user_id']).all()
+        for user_id, phone in rows:
+            if phone:
+                phone_filter.add(phone)
+            _phone_filter['max_user_id'] = max(_phone_filter['max_user_id'], user_id)
+        _phone_filter['refreshed_at'] = time.monotonic()
+    return phone_filter
+
+def find_user_by_phone(raw_phone):
+    """(E.164 number or None, User or None); unregistered numbers are mostly answered by the filter"""
+    phone = normalize_phone(raw_phone, PHONE_COUNTRY_CODE)
+    if phone is None or phone not in get_phone_filter():
+        return phone, None
+    return phone, User.query.filter_by(phone_e164=phone).first()
 
 @app.route('/check_phone', methods=['POST'])
 def check_phone():
     """Check if phone number exists and return account status"""
     phone_number = request.json.get('phone_number')
     
-    user = User.query.filter_by(phone_number=phone_number).first()
+    _, user = find_user_by_phone(phone_number)
     
     if not user:
         return jsonify({'exists': False, 'message': 'No account found with this phone number'})
@@ -146,13 +715,13 @@ def send_otp():
     phone_number = request.json.get('phone_number')
     
     # Verify phone exists
-    user = User.query.filter_by(phone_number=phone_number).first()
+    phone, user = find_user_by_phone(phone_number)
     if not user:
         return jsonify({'success': False, 'message': 'Phone number not registered'})
     
     # For now, we just store the phone in session
     # In production, this would send actual SMS
-    session['otp_phone'] = phone_number
+    session['otp_phone'] = phone
     session['otp_code'] = '1111'  # Always 1111 for testing
     
     return jsonify({'success': True, 'message': 'OTP sent successfully'})
@@ -160,11 +729,13 @@ def send_otp():
 @app.route('/send_registration_otp', methods=['POST'])
 def send_registration_otp():
     """Send OTP for registration (placeholder - always returns success)"""
-    phone_number = request.json.get('phone_number')
+    phone = normalize_phone(request.json.get('phone_number'), PHONE_COUNTRY_CODE)
+    if phone is None:
+        return jsonify({'success': False, 'message': 'Invalid phone number'})
     
     # For registration, we don't check if user exists
     # In production, this would send actual SMS
-    session['otp_phone'] = phone_number
+    session['otp_phone'] = phone
     session['otp_code'] = '1111'  # Always 1111 for testing
     
     return jsonify({'success': True, 'message': 'OTP sent successfully'})
@@ -176,7 +747,7 @@ def verify_otp():
     phone_number = request.json.get('phone_number')
     
     # Check if OTP matches (always 1111 for now)
-    if otp_code == '1111' and phone_number == session.get('otp_phone'):
+    if otp_code == '1111' and normalize_phone(phone_number, PHONE_COUNTRY_CODE) == session.get('otp_phone'):
         session['otp_verified'] = True
         return jsonify({'success': True, 'message': 'OTP verified successfully'})
     else:
@@ -190,7 +761,7 @@ def register():
     
     if request.method == 'POST':
         name = request.form.get('name')
-        phone_number = request.form.get('phone_number')
+        phone_number = normalize_phone(request.form.get('phone_number'), PHONE_COUNTRY_CODE)
         email = request.form.get('email')  # Optional
         password = request.form.get('password')  # Optional
         confirm_password = request.form.get('confirm_password')
@@ -202,7 +773,7 @@ def register():
             flash('Name and phone number are required', 'error')
             return render_template('register.html')
         
-        if not otp_verified:
+        if not otp_verified or phone_number != session.get('otp_phone'):
             flash('Please verify your phone number with OTP', 'error')
             return render_template('register.html')
         
@@ -217,7 +788,7 @@ def register():
                 return render_template('register.html')
         
         # Check if phone number exists
-        if User.query.filter_by(phone_number=phone_number).first():
+        if find_user_by_phone(phone_number)[1]:
             flash('Phone number already registered', 'error')
             return render_template('register.html')
         
@@ -230,6 +801,7 @@ def register():
         user = User(
             name=name,
             phone_number=phone_number,
+            phone_e164=phone_number,
             email=email if email else None,
             language=language,
             trial_end_date=datetime.utcnow() + timedelta(days=3)
@@ -240,7 +812,15 @@ def register():
             user.set_password(password)
         
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Registered concurrently with the same number or email
+            db.session.rollback()
+            flash('Phone number already registered', 'error')
+            return render_template('register.html')
+        if _phone_filter['filter'] is not None:
+            _phone_filter['filter'].add(user.phone_e164)
         
         # Clear OTP session
         session.pop('otp_verified', None)
@@ -263,7 +843,7 @@ def login():
         phone_number = request.form.get('phone_number')
         login_method = request.form.get('login_method', 'otp')  # 'otp' or 'password'
         
-        user = User.query.filter_by(phone_number=phone_number).first()
+        phone, user = find_user_by_phone(phone_number)
         
         if not user:
             flash('Phone number not registered', 'error')
@@ -272,7 +852,7 @@ def login():
         if login_method == 'otp':
             # OTP login (OTP should be verified before form submission)
             otp_verified = session.get('otp_verified', False)
-            if otp_verified:
+            if otp_verified and phone == session.get('otp_phone'):
                 login_user(user)
                 session.pop('otp_verified', None)
                 session.pop('otp_phone', None)
@@ -309,30 +889,21 @@ def main_menu():
         return redirect(url_for('payment'))
     
     quizzes = Quiz.query.filter_by(is_beta=False).all()
+    question_counts = get_question_counts()
+    summaries = get_quiz_summaries(current_user.id)
     
     # Get user's progress for each quiz
     quiz_data = []
     for quiz in quizzes:
-        # Calculate progress percentage
-        total_questions = len(quiz.questions)
-        completed_progress = QuizProgress.query.filter_by(
-            user_id=current_user.id,
-            quiz_id=quiz.id
-        ).all()
-        
-        # Calculate percentage based on completed quizzes
-        if completed_progress:
-            # Get the best score
-            best_score = max([p.score for p in completed_progress])
-            progress_percentage = int((best_score / total_questions) * 100) if total_questions > 0 else 0
+        total_questions = question_counts.get(quiz.id, 0)
+        summary = summaries.get(quiz.id)
+        
+        # Calculate percentage based on the best score
+        if summary:
+            progress_percentage = int((summary.best_score / total_questions) * 100) if total_questions > 0 else 0
         else:
             progress_percentage = 0
         
-        last_progress = QuizProgress.query.filter_by(
-            user_id=current_user.id,
-            quiz_id=quiz.id
-        ).order_by(QuizProgress.completed_at.desc()).first()
-        
         quiz_info = {
             'id': quiz.id,
             'title': quiz.title,
@@ -341,16 +912,16 @@ def main_menu():
             'difficulty': quiz.difficulty,  # Keep for reference but won't show
             'question_count': total_questions,
             'progress_percentage': progress_percentage,
-            'last_score': last_progress.score if last_progress else None,
-            'last_total': last_progress.total_questions if last_progress else None
+            'last_score': summary.last_score if summary else None,
+            'last_total': summary.last_total if summary else None
         }
         quiz_data.append(quiz_info)
     
-    return render_template('main_menu.html', 
-                         quizzes=quiz_data,
-                         trial_days_left=current_user.get_trial_days_left(),
-                         is_paid=current_user.is_paid,
-                         locked_home_page=current_user.locked_home_page)
+    return render_cached_page('main_menu.html',
+                              json_holes={'quizzes': quiz_data},
+                              holes={'trial_days_left': current_user.get_trial_days_left(),
+                                     'locked_home_page': current_user.locked_home_page or ''},
+                              is_paid=current_user.is_paid)
 
 @app.route('/set_home_page', methods=['POST'])
 @login_required
@@ -359,8 +930,7 @@ def set_home_page():
     try:
         data = request.get_json()
         # Store the navigation state as JSON string
-        current_user.locked_home_page = json.dumps(data)
-        db.session.commit()
+        run_write(update_user_fields, current_user.id, {'locked_home_page': json.dumps(data)})
         return jsonify({'success': True, 'message': 'This page has been set as your Home.'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -382,8 +952,7 @@ def get_home_page():
 def remove_home_page():
     """Remove user's saved home page"""
     try:
-        current_user.locked_home_page = None
-        db.session.commit()
+        run_write(update_user_fields, current_user.id, {'locked_home_page': None})
         return jsonify({'success': True, 'message': 'Home page removed.'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -414,20 +983,18 @@ def progress():
     total_quizzes = len(all_quizzes)
     
     # Get user's progress for each quiz
-    completed_quizzes = QuizProgress.query.filter_by(user_id=current_user.id).count()
+    quiz_summaries = get_quiz_summaries(current_user.id)
+    completed_quizzes = sum(summary.attempt_count for summary in quiz_summaries.values())
     
     # Calculate overall progress
     progress_percentage = (completed_quizzes / total_quizzes * 100) if total_quizzes > 0 else 0
     
-    # Get all progress records (not just 5)
-    recent_progress = QuizProgress.query.filter_by(user_id=current_user.id).order_by(QuizProgress.completed_at.desc()).all()
-    
     return render_template('progress.html',
                          current_quiz=current_quiz,
                          completed_quizzes=completed_quizzes,
                          total_quizzes=total_quizzes,
                          progress_percentage=progress_percentage,
-                         recent_progress=recent_progress,
+                         quiz_summaries=quiz_summaries,
                          all_quizzes=all_quizzes)
 
 @app.route('/settings', methods=['GET', 'POST'])
@@ -440,6 +1007,8 @@ def settings():
         new_password = request.form.get('new_password')
         confirm_password = request.form.get('confirm_password')
         new_language = request.form.get('language')
+        changes = {}  # Saved in one write
+        messages = []
         
         if new_email != current_user.email:
             # Check if email is already taken (if it's not empty)
@@ -448,19 +1017,16 @@ def settings():
                 if existing_user and existing_user.id != current_user.id:
                     flash('Email already in use', 'error')
                 else:
-                    current_user.email = new_email
-                    db.session.commit()
-                    flash('Email updated successfully', 'success')
+                    changes['email'] = new_email
+                    messages.append('Email updated successfully')
             else:
                 # Allow removing email
-                current_user.email = None
-                db.session.commit()
-                flash('Email removed', 'success')
+                changes['email'] = None
+                messages.append('Email removed')
         
         if new_language and new_language != current_user.language:
-            current_user.language = new_language
-            db.session.commit()
-            flash('Language updated successfully', 'success')
+            changes['language'] = new_language
+            messages.append('Language updated successfully')
         
         if new_password:
             if new_password != confirm_password:
@@ -468,21 +1034,22 @@ def settings():
             elif len(new_password) < 6:
                 flash('Password must be at least 6 characters', 'error')
             else:
-                current_user.set_password(new_password)
-                db.session.commit()
-                if current_user.has_password():
-                    flash('Password updated successfully', 'success')
-                else:
-                    flash('Password added successfully', 'success')
+                changes['password_hash'] = generate_password_hash(new_password)
+                messages.append('Password updated successfully' if current_user.has_password() else 'Password added successfully')
+        
+        if changes:
+            run_write(update_user_fields, current_user.id, changes)
+            for message in messages:
+                flash(message, 'success')
         
         return redirect(url_for('settings'))
     
     # Get feedback delay from session
     feedback_delay = session.get('feedback_delay', 2)
     
-    return render_template('settings.html', 
-                         feedback_delay=feedback_delay,
-                         has_password=current_user.has_password())
+    return render_cached_page('settings.html',
+                              holes={'feedback_delay': feedback_delay},
+                              has_password=current_user.has_password())
 
 @app.route('/set_delay', methods=['POST'])
 @login_required
@@ -521,9 +1088,9 @@ def payment():
             flash('Payment successful! You now have full access.', 'success')
             return redirect(url_for('main_menu'))
     
-    return render_template('payment.html',
-                         trial_days_left=current_user.get_trial_days_left(),
-                         has_access=current_user.has_access())
+    return render_cached_page('payment.html',
+                              holes={'trial_days_left': current_user.get_trial_days_left()},
+                              has_access=current_user.has_access())
 
 @app.route('/quiz_details/<int:quiz_id>')
 @login_required
@@ -531,24 +1098,15 @@ def quiz_details(quiz_id):
     """Get quiz details for the settings modal"""
     quiz = Quiz.query.get_or_404(quiz_id)
     
-    # Count question types - check for comma in correct_answers (properly trimmed)
-    single_answer_count = 0
-    multiple_answer_count = 0
-    
-    for question in quiz.questions:
-        # Clean the correct_answers string and check for multiple answers
-        correct_ans = str(question.correct_answers).strip()
-        if ',' in correct_ans:
-            multiple_answer_count += 1
-    else:
-            single_answer_count += 1
+    # Count question types - a comma in correct_answers means multiple answers
+    total_questions, multiple_answer_count = db.session.execute(question_type_counts_statement(quiz.id)).one()
     
     return jsonify({
         'id': quiz.id,
         'title': quiz.title,
         'description': quiz.description,
-        'total_questions': len(quiz.questions),
-        'single_answer_count': single_answer_count,
+        'total_questions': total_questions,
+        'single_answer_count': total_questions - multiple_answer_count,
         'multiple_answer_count': multiple_answer_count
     })
 
@@ -568,82 +1126,1262 @@ def quiz_page(quiz_id):
                          quiz=quiz,
                          feedback_delay=feedback_delay)
 
+def serialize_question(q, translation=None):
+    """Convert a Question into the JSON shape used by the quiz page, preferring translated text"""
+    def text(field):
+        translated = getattr(translation, field, None) if translation else None
+        return translated or getattr(q, field)
+    
+    options_list = []
+    for letter in ['A', 'B', 'C', 'D', 'E']:
+        option_text = text(f'option_{letter.lower()}')
+        if option_text:
+            options_list.append({
+                'letter': letter,
+                'text': option_text
+            })
+    
+    correct_answers = q.correct_answers.split(',') if ',' in q.correct_answers else [q.correct_answers]
+    
+    return {
+        'id': q.id,
+        'question': text('question_text'),
+        'options': options_list,
+        'correct_answers': correct_answers
+    }
+
+def get_catalog_version():
+    """Current catalog version (0 before the first import)"""
+    catalog = db.session.get(CatalogVersion, 1)
+    return catalog.version if catalog else 0
+
+# The catalog version only changes on import; for the page cache and the
+# question bundle, re-reading it on every request would cost about as much as
+# the work they save
+CATALOG_VERSION_TTL = 5  # seconds
+_cached_catalog_version = [None, 0.0]  # [version, read at]
+
+def get_cached_catalog_version():
+    now = time.monotonic()
+    if _cached_catalog_version[0] is None or now - _cached_catalog_version[1] > CATALOG_VERSION_TTL:
+        _cached_catalog_version[:] = [get_catalog_version(), now]
+    return _cached_catalog_version[0]
+
+def bump_catalog_version():
+    """Mark the catalog as changed; compiled payloads of older versions become stale"""
+    catalog = db.session.get(CatalogVersion, 1)
+    if not catalog:
+        catalog = CatalogVersion(id=1, version=0)
+        db.session.add(catalog)
+    catalog.version += 1
+    db.session.commit()
+    _cached_catalog_version[0] = None
+    page_cache.invalidate()
+    return catalog.version
+
+def compile_quiz_payload(quiz_id, language):
+    """Build the question list of a quiz in one language, with English fallback resolved up front"""
+    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order_num, Question.id).all()
+    
+    translations = {}
+    if language != DEFAULT_LANGUAGE:
+        translations = {
+            t.question_id: t for t in
+            QuestionTranslation.query.join(Question).filter(
+                Question.quiz_id == quiz_id,
+                QuestionTranslation.language == language
+            )
+        }
+    
+    return [serialize_question(q, translations.get(q.id)) for q in questions]
+
+# In-process cache of compiled payloads: {(quiz_id, language): (catalog_version, payload)}
+_quiz_payload_cache = {}
+
+def get_quiz_payload(quiz_id, language):
+    """
+    Compiled question list of a quiz in the given language.
+    Served from the in-process cache, then from the QuizPayload table, and
+    compiled (and stored) only when both are missing or stale.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        language = DEFAULT_LANGUAGE
+    
+    version = get_catalog_version()
+    cached = _quiz_payload_cache.get((quiz_id, language))
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    stored = QuizPayload.query.filter_by(quiz_id=quiz_id, language=language).first()
+    if stored and stored.catalog_version == version:
+        payload = json.loads(stored.payload)
+    else:
+        payload = compile_quiz_payload(quiz_id, language)
+        payload_json = json.dumps(payload)
+        content_hash = hashlib.sha1(payload_json.encode('utf-8')).hexdigest()
+        if not stored:
+            stored = QuizPayload(quiz_id=quiz_id, language=language)
+            db.session.add(stored)
+        if stored.content_hash != content_hash:
+            # Offline clients only re-download quizzes whose content changed
+            stored.changed_version = version
+            stored.content_hash = content_hash
+        stored.catalog_version = version
+        stored.payload = payload_json
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored the same payload concurrently
+            db.session.rollback()
+    
+    _quiz_payload_cache[(quiz_id, language)] = (version, payload)
+    return payload
+
+def compile_all_quiz_payloads():
+    """Precompile payloads of every quiz in every supported language"""
+    for (quiz_id,) in db.session.query(Quiz.id):
+        for language in SUPPORTED_LANGUAGES:
+            get_quiz_payload(quiz_id, language)
+
+# Compiled question bundles: one memory-mapped file per language, written by
+# the importer and shared by every worker through the OS page cache
+QUESTION_BUNDLE_DIR = os.environ.get('QUIZ_BUNDLE_DIR', app.instance_path)
+_question_bundles = {}  # language -> (QuestionBundle or None, file mtime, catalog version checked)
+
+def question_bundle_path(language):
+    return os.path.join(QUESTION_BUNDLE_DIR, f'question_bundle.{language}.bin')
+
+def write_question_bundles():
+    """Write the bundle of every supported language from the compiled payloads"""
+    os.makedirs(QUESTION_BUNDLE_DIR, exist_ok=True)
+    version = get_catalog_version()
+    quiz_ids = [quiz_id for (quiz_id,) in db.session.query(Quiz.id)]
+    stats = {}
+    for language in SUPPORTED_LANGUAGES:
+        stats[language] = write_bundle(
+            question_bundle_path(language),
+            version,
+            ((quiz_id, get_quiz_payload(quiz_id, language)) for quiz_id in quiz_ids),
+            app.json.dumps
+        )
+        _question_bundles.pop(language, None)
+    return stats
+
+def get_question_bundle(language):
+    """Mapped bundle of a language, or None when it is missing or older than the catalog"""
+    version = get_cached_catalog_version()
+    cached = _question_bundles.get(language)
+    if cached is not None and cached[0] is not None and cached[0].catalog_version == version:
+        return cached[0]
+    
+    # A missing or stale file is only looked at again once it or the catalog changes
+    path = question_bundle_path(language)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if cached is None or cached[1:] != (mtime, version):
+        bundle = None
+        if mtime is not None:
+            try:
+                bundle = QuestionBundle(path)
+            except (OSError, ValueError):
+                pass
+        cached = (bundle, mtime, version)
+        _question_bundles[language] = cached
+    bundle = cached[0]
+    return bundle if bundle is not None and bundle.catalog_version == version else None
+
+def filter_payload(payload, question_filter):
+    """New list with the payload questions matching the type filter (all, single, multiple)"""
+    if question_filter == 'single':
+        return [q for q in payload if len(q['correct_answers']) == 1]
+    elif question_filter == 'multiple':
+        return [q for q in payload if len(q['correct_answers']) > 1]
+    # else: 'all' - no filtering
+    return list(payload)
+
+# Adaptive mode: per-worker rating arrays of each quiz, updated in place by
+# this worker's graded answers and reloaded after the TTL
+ADAPTIVE_BATCH_SIZE = 20
+ADAPTIVE_MAX_BATCH_SIZE = 100
+ADAPTIVE_MODEL_TTL = 60  # seconds
+ADAPTIVE_RECENT_WINDOW = timedelta(hours=24)  # Questions answered this recently are left out
+_quiz_rating_models = {}
+
+def get_quiz_rating_model(quiz_id):
+    model = _quiz_rating_models.get(quiz_id)
+    if model is None or time.monotonic() - model.loaded_at > ADAPTIVE_MODEL_TTL:
+        rows = db.session.query(Question.id, QuestionRating.rating).outerjoin(
+            QuestionRating, QuestionRating.question_id == Question.id
+        ).filter(Question.quiz_id == quiz_id).all()
+        model = QuizRatingModel(
+            [question_id for question_id, _ in rows],
+            [rating if rating is not None else INITIAL_RATING for _, rating in rows]
+        )
+        _quiz_rating_models[quiz_id] = model
+    return model
+
+def get_user_mastery_rating(user_id, quiz_id):
+    rating = db.session.query(UserMastery.rating).filter_by(user_id=user_id, quiz_id=quiz_id).scalar()
+    return rating if rating is not None else INITIAL_RATING
+
+def recently_answered_question_ids(user_id, quiz_id, limit):
+    """Ids of the (at most `limit`) questions of a quiz the user answered most recently, within the window"""
+    if limit <= 0:
+        return set()
+    return {
+        question_id for (question_id,) in db.session.query(AnsweredQuestion.question_id).filter(
+            AnsweredQuestion.user_id == user_id,
+            AnsweredQuestion.quiz_id == quiz_id,
+            AnsweredQuestion.answered_at > datetime.utcnow() - ADAPTIVE_RECENT_WINDOW
+        ).order_by(AnsweredQuestion.answered_at.desc()).limit(limit)
+    }
+
+def select_adaptive_questions(quiz_id, user_id, payload, count):
+    """Payload questions picked for the user's mastery, in random order"""
+    model = get_quiz_rating_model(quiz_id)
+    # Recent questions are left out, but never so many that fewer than `count` remain
+    recent = recently_answered_question_ids(user_id, quiz_id, len(model) - count)
+    selected_ids = model.select(get_user_mastery_rating(user_id, quiz_id), count, exclude=recent)
+    by_id = {q['id']: q for q in payload}
+    return [by_id[question_id] for question_id in selected_ids if question_id in by_id]
+
 @app.route('/get_quiz_data/<int:quiz_id>')
 @login_required
 def get_quiz_data(quiz_id):
-    """Get quiz questions for a specific quiz"""
+    """Get quiz questions for a specific quiz in the user's language"""
     if not current_user.has_access():
         return jsonify({'error': 'Access denied'}), 403
     
     # Get question filter type from query parameter
-    question_filter = request.args.get('filter', 'all')  # all, single, multiple
+    question_filter = request.args.get('filter', 'all')  # all, single, multiple, adaptive
+    
+    language = current_user.language if current_user.language in SUPPORTED_LANGUAGES else DEFAULT_LANGUAGE
+    if question_filter != 'adaptive':
+        # Fast path: the response is assembled from the mapped bundle's JSON bytes
+        bundle = get_question_bundle(language)
+        body = bundle.quiz_json(quiz_id, question_filter, random.shuffle) if bundle else None
+        if body is not None:
+            return app.response_class(body + b'\n', mimetype='application/json')
     
     quiz = Quiz.query.get_or_404(quiz_id)
-    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order_num).all()
+    payload = get_quiz_payload(quiz.id, language)
     
-    # Filter questions based on type
-    if question_filter == 'single':
-        questions = [q for q in questions if ',' not in str(q.correct_answers).strip()]
-    elif question_filter == 'multiple':
-        questions = [q for q in questions if ',' in str(q.correct_answers).strip()]
-    # else: 'all' - no filtering
+    if question_filter == 'adaptive':
+        try:
+            count = min(max(1, int(request.args.get('count', ADAPTIVE_BATCH_SIZE))), ADAPTIVE_MAX_BATCH_SIZE)
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid count'}), 400
+        return jsonify(select_adaptive_questions(quiz.id, current_user.id, payload, count))
     
-    quiz_data = []
-    for q in questions:
-        options_list = []
-        for i, letter in enumerate(['A', 'B', 'C', 'D', 'E']):
-            option_text = getattr(q, f'option_{letter.lower()}', None)
-            if option_text:
-                options_list.append({
-                    'letter': letter,
-                    'text': option_text
-                })
-        
-        correct_answers = q.correct_answers.split(',') if ',' in q.correct_answers else [q.correct_answers]
-        
-        quiz_data.append({
-            'id': q.id,
-            'question': q.question_text,
-            'options': options_list,
-            'correct_answers': correct_answers
-        })
+    quiz_data = filter_payload(payload, question_filter)
     
     # Shuffle questions
     random.shuffle(quiz_data)
     
     return jsonify(quiz_data)
 
+def record_rated_answer(user_id, quiz_id, question_id, correct):
+    """Apply one graded answer to the user's mastery and the question's rating (a run_write write); returns both new ratings"""
+    question_rating = db.session.get(QuestionRating, question_id)
+    if not question_rating:
+        question_rating = QuestionRating(question_id=question_id, rating=INITIAL_RATING, answer_count=0)
+        db.session.add(question_rating)
+    mastery = UserMastery.query.filter_by(user_id=user_id, quiz_id=quiz_id).first()
+    if not mastery:
+        mastery = UserMastery(user_id=user_id, quiz_id=quiz_id, rating=INITIAL_RATING, answer_count=0)
+        db.session.add(mastery)
+    
+    mastery.rating, question_rating.rating = elo_update(
+        mastery.rating, mastery.answer_count, question_rating.rating, question_rating.answer_count, correct
+    )
+    mastery.answer_count += 1
+    question_rating.answer_count += 1
+    
+    answered = AnsweredQuestion.query.filter_by(user_id=user_id, question_id=question_id).first()
+    if not answered:
+        answered = AnsweredQuestion(user_id=user_id, quiz_id=quiz_id, question_id=question_id)
+        db.session.add(answered)
+    answered.answered_at = datetime.utcnow()
+    return mastery.rating, question_rating.rating
+
+@app.route('/record_answer', methods=['POST'])
+@login_required
+def record_answer():
+    """Update the user's mastery and the question's difficulty from one graded answer"""
+    if not current_user.has_access():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.json or {}
+    question_id = data.get('question_id')
+    correct = data.get('correct')
+    
+    if not isinstance(question_id, int) or isinstance(question_id, bool) or not isinstance(correct, bool):
+        return jsonify({'error': 'Invalid data'}), 400
+    
+    quiz_id = db.session.query(Question.quiz_id).filter_by(id=question_id).scalar()
+    if quiz_id is None:
+        return jsonify({'error': 'Unknown question'}), 404
+    
+    mastery_rating, question_rating = run_write(record_rated_answer, current_user.id, quiz_id, question_id, correct)
+    
+    model = _quiz_rating_models.get(quiz_id)
+    if model is not None:
+        model.update(question_id, question_rating)
+    
+    return jsonify({'success': True, 'mastery': round(mastery_rating, 1)})
+
+# Quiz sessions: a resumable attempt that serves its questions page by page.
+# Only the shuffle seed and the cursor are stored; the question order is
+# re-derived from the seed on every request.
+QUIZ_SESSION_PAGE_SIZE = 10
+QUIZ_SESSION_MAX_PAGE_SIZE = 50
+
+def session_questions(quiz_session):
+    """Return the session's questions, in the user's language, in their shuffled order"""
+    questions = filter_payload(
+        get_quiz_payload(quiz_session.quiz_id, current_user.language),
+        quiz_session.question_filter
+    )
+    random.Random(quiz_session.seed).shuffle(questions)
+    return questions
+
+def get_own_quiz_session(session_id):
+    """Load a quiz session belonging to the current user or abort with 404"""
+    return QuizSession.query.filter_by(id=session_id, user_id=current_user.id).first_or_404()
+
+@app.route('/quiz_session', methods=['POST'])
+@login_required
+def create_quiz_session():
+    """Start a new quiz session with a fresh shuffle seed"""
+    if not current_user.has_access():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.json or {}
+    quiz_id = data.get('quiz_id')
+    question_filter = data.get('filter', 'all')
+    
+    if question_filter not in ('all', 'single', 'multiple'):
+        return jsonify({'error': 'Invalid filter'}), 400
+    
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    quiz_session = QuizSession(
+        user_id=current_user.id,
+        quiz_id=quiz.id,
+        question_filter=question_filter,
+        seed=random.getrandbits(31),
+        total_questions=len(filter_payload(get_quiz_payload(quiz.id, current_user.language), question_filter))
+    )
+    db.session.add(quiz_session)
+    db.session.commit()
+    
+    return jsonify(quiz_session.to_dict()), 201
+
+@app.route('/quiz_session/<int:session_id>')
+@login_required
+def get_quiz_session(session_id):
+    """Get the state of a quiz session so the client can resume it"""
+    quiz_session = get_own_quiz_session(session_id)
+    return jsonify(quiz_session.to_dict())
+
+@app.route('/quiz_session/<int:session_id>/questions')
+@login_required
+def get_quiz_session_questions(session_id):
+    """Get one page of a session's questions in the session's shuffled order"""
+    if not current_user.has_access():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    quiz_session = get_own_quiz_session(session_id)
+    
+    try:
+        offset = max(0, int(request.args.get('offset', quiz_session.cursor)))
+        limit = int(request.args.get('limit', QUIZ_SESSION_PAGE_SIZE))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid offset or limit'}), 400
+    limit = min(max(1, limit), QUIZ_SESSION_MAX_PAGE_SIZE)
+    
+    questions = session_questions(quiz_session)
+    
+    return jsonify({
+        'offset': offset,
+        'total': len(questions),
+        'questions': questions[offset:offset + limit]
+    })
+
+@app.route('/quiz_session/<int:session_id>/progress', methods=['POST'])
+@login_required
+def update_quiz_session(session_id):
+    """Save the cursor and running score of a quiz session"""
+    quiz_session = get_own_quiz_session(session_id)
+    if quiz_session.completed_at:
+        return jsonify({'error': 'Quiz session already completed'}), 409
+    data = request.json or {}
+    
+    cursor = data.get('cursor', quiz_session.cursor)
+    score = data.get('score', quiz_session.score)
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (cursor, score)):
+        return jsonify({'error': 'Invalid cursor or score'}), 400
+    
+    # Every answered question scores at most one point
+    if not 0 <= score <= cursor <= quiz_session.total_questions:
+        return jsonify({'error': 'Cursor or score out of range'}), 400
+    
+    quiz_session.cursor = cursor
+    quiz_session.score = score
+    db.session.commit()
+    
+    return jsonify({'success': True})
+
 @app.route('/submit_quiz', methods=['POST'])
 @login_required
 def submit_quiz():
     """Submit quiz results"""
-    data = request.json
+    data = request.json or {}
     quiz_id = data.get('quiz_id')
     score = data.get('score')
     total = data.get('total')
+    session_id = data.get('session_id')  # Optional - quiz session being finished
+    
+    client_id = data.get('client_id')  # Optional - makes a retried submit count once
     
-    if not quiz_id or score is None or total is None:
+    if not valid_attempt(quiz_id, score, total) or not (client_id is None or valid_client_id(client_id)):
         return jsonify({'error': 'Invalid data'}), 400
+    if db.session.get(Quiz, quiz_id) is None:
+        return jsonify({'error': 'Quiz not found'}), 404
     
     # Save progress
-    progress = QuizProgress(
-        user_id=current_user.id,
-        quiz_id=quiz_id,
-        score=score,
-        total_questions=total
+    for retry in range(2):
+        try:
+            leaderboard_changes = run_write(
+                record_quiz_submission, current_user.id, quiz_id, score, total, session_id, datetime.utcnow(), client_id
+            )
+            break
+        except IntegrityError:
+            # A concurrent request recorded the same attempt (or created the summary
+            # first); the retry sees its rows
+            db.session.rollback()
+            if retry:
+                raise
+    if leaderboard_changes is None:
+        return jsonify({'success': True, 'duplicate': True})
+    refresh_cached_boards(leaderboard_changes)
+    
+    return jsonify({'success': True})
+
+LEADERBOARD_MAX_LIMIT = 100
+ISO_WEEK_PERIOD = re.compile(r'^\d{4}-W\d{2}$')
+
+def leaderboard_response(board_type, board_key):
+    """Top N plus the current user's rank for one board"""
+    period = request.args.get('period', 'all')  # all, week, or an ISO week like 2026-W42
+    if period == 'week':
+        period = week_period(datetime.utcnow())
+    elif period != 'all' and not ISO_WEEK_PERIOD.fullmatch(period):
+        return jsonify({'error': 'Invalid period'}), 400
+    try:
+        limit = min(max(1, int(request.args.get('limit', 10))), LEADERBOARD_MAX_LIMIT)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    board = get_ranked_board(board_type, board_key, period)
+    top = board.top(limit)
+    names = dict(
+        db.session.query(User.id, User.name).filter(User.id.in_([user_id for _, user_id, _ in top])).all()
+    ) if top else {}
+    
+    my_rank = board.rank(current_user.id)
+    return jsonify({
+        'board': board_type,
+        'key': board_key,
+        'period': period,
+        'total': len(board),
+        'top': [
+            {'rank': rank, 'user_id': user_id, 'name': names.get(user_id), 'score': score}
+            for rank, user_id, score in top
+        ],
+        'me': {'rank': my_rank, 'score': board.score(current_user.id)} if my_rank else None
+    })
+
+@app.route('/leaderboard/quiz/<int:quiz_id>')
+@login_required
+def quiz_leaderboard(quiz_id):
+    """Leaderboard of best percentages on one quiz"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    return leaderboard_response('quiz', str(quiz.id))
+
+@app.route('/leaderboard/category/<path:category>')
+@login_required
+def category_leaderboard(category):
+    """Leaderboard of summed best percentages over a category's quizzes"""
+    if not Quiz.query.filter_by(category=category).first():
+        return jsonify({'error': 'Unknown category'}), 404
+    return leaderboard_response('category', category)
+
+# Offline bundles: every quiz of a category in one download, versioned by the
+# catalog version at which each quiz last changed
+OFFLINE_SYNC_MAX_ATTEMPTS = 500
+# {(category, language): (catalog_version, etag, body)}
+_offline_bundle_cache = {}
+
+def build_offline_bundle(category, language, since=None):
+    """
+    Quizzes of a category with their compiled payloads, or None for an
+    unknown category. With `since`, only quizzes changed after that version
+    are included; `quiz_ids` always lists every current quiz so clients can
+    drop removed ones.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        language = DEFAULT_LANGUAGE
+    quizzes = Quiz.query.filter_by(category=category).order_by(Quiz.id).all()
+    if not quizzes:
+        return None
+    
+    quiz_ids = [quiz.id for quiz in quizzes]
+    versions = dict(db.session.query(QuizPayload.quiz_id, QuizPayload.changed_version).filter(
+        QuizPayload.quiz_id.in_(quiz_ids), QuizPayload.language == language
+    ))
+    # Payloads are only loaded for the quizzes sent; one that was never compiled
+    # is compiled here, which also gives it a version
+    payloads = {
+        quiz_id: get_quiz_payload(quiz_id, language) for quiz_id in quiz_ids
+        if quiz_id not in versions or since is None or versions[quiz_id] > since
+    }
+    missing = [quiz_id for quiz_id in payloads if quiz_id not in versions]
+    if missing:
+        versions.update(db.session.query(QuizPayload.quiz_id, QuizPayload.changed_version).filter(
+            QuizPayload.quiz_id.in_(missing), QuizPayload.language == language
+        ))
+    
+    return {
+        'category': category,
+        'language': language,
+        'catalog_version': get_catalog_version(),
+        'bundle_version': max(versions.values(), default=0),
+        'quiz_ids': quiz_ids,
+        'quizzes': [
+            {
+                'id': quiz.id,
+                'title': quiz.title,
+                'description': quiz.description,
+                'version': versions.get(quiz.id, 0),
+                'questions': payloads[quiz.id]
+            }
+            for quiz in quizzes if quiz.id in payloads and (since is None or versions.get(quiz.id, 0) > since)
+        ]
+    }
+
+def offline_bundle_response(category, language):
+    """Full bundle as a conditional response; the body is cached per worker until the catalog changes"""
+    version = get_catalog_version()
+    cached = _offline_bundle_cache.get((category, language))
+    if not cached or cached[0] != version:
+        bundle = build_offline_bundle(category, language)
+        if bundle is None:
+            return jsonify({'error': 'Unknown category'}), 404
+        # The quiz set is part of the tag: removing a quiz does not raise the bundle version
+        quiz_set = zlib.crc32(','.join(map(str, bundle['quiz_ids'])).encode('ascii'))
+        cached = (version, f"{language}-{bundle['bundle_version']}-{quiz_set:08x}", json.dumps(bundle))
+        _offline_bundle_cache[(category, language)] = cached
+    
+    response = app.response_class(cached[2], mimetype='application/json')
+    response.set_etag(cached[1])
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/service-worker.js')
+def service_worker():
+    """Service worker that keeps quiz pages and saved category bundles for offline use"""
+    response = app.response_class(render_template('service-worker.js'), mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/offline/bundle')
+@login_required
+def offline_bundle():
+    """Every quiz of a category with its questions, for offline use"""
+    if not current_user.has_access():
+        return jsonify({'error': 'Access denied'}), 403
+    category = request.args.get('category')
+    if not category:
+        return jsonify({'error': 'Missing category'}), 400
+    return offline_bundle_response(category, current_user.language)
+
+@app.route('/offline/delta')
+@login_required
+def offline_delta():
+    """Quizzes of a category changed since the bundle version a client holds"""
+    if not current_user.has_access():
+        return jsonify({'error': 'Access denied'}), 403
+    category = request.args.get('category')
+    try:
+        since = int(request.args.get('since', 0))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid version'}), 400
+    if not category:
+        return jsonify({'error': 'Missing category'}), 400
+    
+    bundle = build_offline_bundle(category, current_user.language, since=since)
+    if bundle is None:
+        return jsonify({'error': 'Unknown category'}), 404
+    return jsonify(bundle)
+
+def parse_offline_attempt(item, now):
+    """(client_id, quiz_id, score, total, completed_at) of one queued attempt, or None when malformed"""
+    if not isinstance(item, dict):
+        return None
+    client_id = item.get('client_id')
+    quiz_id, score, total = item.get('quiz_id'), item.get('score'), item.get('total')
+    if not valid_client_id(client_id):
+        return None
+    if not valid_attempt(quiz_id, score, total):
+        return None
+    
+    completed_at = now
+    if item.get('completed_at'):
+        try:
+            completed_at = datetime.fromisoformat(str(item['completed_at']).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if completed_at.tzinfo is not None:
+            completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+        completed_at = min(completed_at, now)  # Client clocks may run ahead
+    return client_id, quiz_id, score, total, completed_at
+
+def ingest_offline_attempts(user_id, items):
+    """
+    Record queued attempts the user has not synced before (caller commits).
+    Returns (accepted, duplicates, rejected) client ids and the changed
+    leaderboard entries.
+    """
+    now = datetime.utcnow()
+    parsed, rejected = [], []
+    for item in items:
+        attempt = parse_offline_attempt(item, now)
+        if attempt is None:
+            rejected.append(item.get('client_id') if isinstance(item, dict) else None)
+        else:
+            parsed.append(attempt)
+    
+    client_ids = [attempt[0] for attempt in parsed]
+    quiz_ids = {attempt[1] for attempt in parsed}
+    synced = {
+        client_id for (client_id,) in db.session.query(OfflineAttempt.client_id).filter(
+            OfflineAttempt.user_id == user_id, OfflineAttempt.client_id.in_(client_ids)
+        )
+    } if client_ids else set()
+    known_quizzes = {
+        quiz_id for (quiz_id,) in db.session.query(Quiz.id).filter(Quiz.id.in_(quiz_ids))
+    } if quiz_ids else set()
+    
+    accepted, duplicates, leaderboard_changes = [], [], []
+    # Oldest first, so summaries and boards see attempts in the order they were taken
+    for client_id, quiz_id, score, total, completed_at in sorted(parsed, key=lambda attempt: attempt[4]):
+        if client_id in synced:
+            duplicates.append(client_id)
+            continue
+        if quiz_id not in known_quizzes:
+            rejected.append(client_id)
+            continue
+        synced.add(client_id)
+        db.session.add(OfflineAttempt(user_id=user_id, client_id=client_id, synced_at=now))
+        update_quiz_summary(user_id, quiz_id, score, total, completed_at)
+        db.session.add(QuizProgress(
+            user_id=user_id,
+            quiz_id=quiz_id,
+            score=score,
+            total_questions=total,
+            completed_at=completed_at
+        ))
+        leaderboard_changes.extend(update_leaderboards(user_id, quiz_id, score, total, completed_at))
+        accepted.append(client_id)
+    
+    return accepted, duplicates, rejected, leaderboard_changes
+
+@app.route('/offline/sync', methods=['POST'])
+@login_required
+def offline_sync():
+    """Record a batch of attempts taken offline in one transaction; safe to retry"""
+    data = request.json or {}
+    items = data.get('attempts')
+    if not isinstance(items, list) or len(items) > OFFLINE_SYNC_MAX_ATTEMPTS:
+        return jsonify({'error': f'attempts must be a list of at most {OFFLINE_SYNC_MAX_ATTEMPTS}'}), 400
+    
+    for retry in range(2):
+        accepted, duplicates, rejected, leaderboard_changes = ingest_offline_attempts(current_user.id, items)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            # The same batch was synced concurrently; the retry sees its ids as duplicates
+            db.session.rollback()
+            if retry:
+                raise
+    refresh_cached_boards(leaderboard_changes)
+    
+    return jsonify({
+        'success': True,
+        'accepted': accepted,
+        'duplicates': duplicates,
+        'rejected': rejected
+    })
+
+# Exports: rows are streamed from the database in batches and written out in
+# chunks, so memory does not grow with the number of rows exported
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+def parse_export_date(value):
+    """Date filter from YYYY-MM-DD, or None when not given"""
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+def date_range_filters(column, start, end):
+    """Filters for start <= column < end + 1 day (both dates inclusive)"""
+    filters = []
+    if start:
+        filters.append(column >= start)
+    if end:
+        filters.append(column < end + timedelta(days=1))
+    return filters
+
+def export_users(category=None, start=None, end=None, include_archived=False):
+    """Users, optionally by signup date (category does not apply)"""
+    query = db.session.query(
+        User.id, User.name, User.phone_number, User.email, User.language,
+        User.created_at, User.trial_end_date, User.is_paid
+    ).filter(*date_range_filters(User.created_at, start, end)).order_by(User.id)
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield row._asdict()
+
+def export_attempts(category=None, start=None, end=None, include_archived=False):
+    """Quiz attempts with their quiz, optionally by category and completion date"""
+    query = db.session.query(
+        QuizProgress.id, QuizProgress.user_id, QuizProgress.quiz_id, Quiz.title, Quiz.category,
+        QuizProgress.score, QuizProgress.total_questions, QuizProgress.completed_at
+    ).join(Quiz, Quiz.id == QuizProgress.quiz_id).filter(
+        *date_range_filters(QuizProgress.completed_at, start, end)
+    ).order_by(QuizProgress.id)
+    if category:
+        query = query.filter(Quiz.category == category)
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield row._asdict()
+    
+    if not include_archived:
+        return
+    # Archived attempts are filtered chunk by chunk; one chunk is decompressed at a time
+    query = db.session.query(QuizProgressArchive, Quiz.title, Quiz.category).join(
+        Quiz, Quiz.id == QuizProgressArchive.quiz_id
+    ).order_by(QuizProgressArchive.id)
+    if category:
+        query = query.filter(Quiz.category == category)
+    if start:
+        query = query.filter(QuizProgressArchive.last_completed_at >= start)
+    if end:
+        query = query.filter(QuizProgressArchive.first_completed_at < end + timedelta(days=1))
+    for chunk, title, quiz_category in query.yield_per(EXPORT_BATCH_SIZE // 10):
+        for attempt in chunk.attempts():
+            completed_at = datetime.fromisoformat(attempt['completed_at']) if attempt['completed_at'] else None
+            if completed_at and ((start and completed_at < start) or (end and completed_at >= end + timedelta(days=1))):
+                continue
+            yield {
+                'id': attempt['id'],
+                'user_id': chunk.user_id,
+                'quiz_id': chunk.quiz_id,
+                'title': title,
+                'category': quiz_category,
+                'score': attempt['score'],
+                'total_questions': attempt['total_questions'],
+                'completed_at': completed_at
+            }
+        db.session.expunge(chunk)
+
+def export_quiz_stats(category=None, start=None, end=None, include_archived=False):
+    """Per-quiz aggregates over the live attempt log (archived attempts are not included)"""
+    percentage = QuizProgress.score * 100.0 / db.func.nullif(QuizProgress.total_questions, 0)
+    attempts = db.and_(QuizProgress.quiz_id == Quiz.id, *date_range_filters(QuizProgress.completed_at, start, end))
+    query = db.session.query(
+        Quiz.id.label('quiz_id'), Quiz.title, Quiz.category,
+        db.func.count(QuizProgress.id).label('attempts'),
+        db.func.count(db.distinct(QuizProgress.user_id)).label('users'),
+        db.func.round(db.func.avg(percentage), 1).label('avg_percentage'),
+        db.func.max(percentage).label('best_percentage'),
+        db.func.min(QuizProgress.completed_at).label('first_completed_at'),
+        db.func.max(QuizProgress.completed_at).label('last_completed_at')
+    ).outerjoin(QuizProgress, attempts).group_by(Quiz.id).order_by(Quiz.id)
+    if category:
+        query = query.filter(Quiz.category == category)
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        yield row._asdict()
+
+EXPORTS = {
+    'users': export_users,
+    'attempts': export_attempts,
+    'quiz_stats': export_quiz_stats,
+}
+
+class _Echo:
+    """File-like object whose write returns the line, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def stream_export(rows, export_format):
+    """Yield the rows as CSV (with a header) or NDJSON text, one chunk per batch"""
+    writer = csv.writer(_Echo())
+    chunk = []
+    header_written = False
+    for row in rows:
+        if export_format == 'csv':
+            if not header_written:
+                chunk.append(writer.writerow(list(row)))
+                header_written = True
+            chunk.append(writer.writerow([export_value(value) for value in row.values()]))
+        else:
+            chunk.append(json.dumps({key: export_value(value) for key, value in row.items()}, ensure_ascii=False) + '\n')
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+@app.route('/admin/export/<kind>')
+@login_required
+def admin_export(kind):
+    """Stream users, attempts or per-quiz stats as CSV or NDJSON"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    if kind not in EXPORTS:
+        return jsonify({'error': 'Unknown export'}), 404
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format'}), 400
+    try:
+        start = parse_export_date(request.args.get('start'))
+        end = parse_export_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    
+    rows = EXPORTS[kind](
+        category=request.args.get('category') or None,
+        start=start,
+        end=end,
+        include_archived=request.args.get('archived') == '1'
     )
-    db.session.add(progress)
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    extension = 'csv' if export_format == 'csv' else 'ndjson'
+    return app.response_class(
+        stream_with_context(stream_export(rows, export_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={kind}.{extension}'}
+    )
+
+@app.route('/admin/metrics/group_commit')
+@login_required
+def group_commit_metrics():
+    """Batch size and latency distributions of this worker's group commit queue"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(dict(group_commit_queue.stats(), enabled=app.config['GROUP_COMMIT_ENABLED'], pid=os.getpid()))
+
+def rebuild_quiz_summaries(missing_only=True):
+    """
+    Build UserQuizSummary rows from the raw QuizProgress log.
+    With missing_only=True only (user, quiz) pairs without a summary are
+    created, so summaries of already-archived attempts are kept intact.
+    """
+    # One pass over the log: window aggregates per (user, quiz) plus the
+    # latest attempt picked by row number
+    partition = (QuizProgress.user_id, QuizProgress.quiz_id)
+    ranked = db.session.query(
+        QuizProgress.user_id,
+        QuizProgress.quiz_id,
+        QuizProgress.score,
+        QuizProgress.total_questions,
+        QuizProgress.completed_at,
+        db.func.max(QuizProgress.score).over(partition_by=partition).label('best_score'),
+        db.func.count(QuizProgress.id).over(partition_by=partition).label('attempt_count'),
+        db.func.row_number().over(
+            partition_by=partition,
+            order_by=(QuizProgress.completed_at.desc(), QuizProgress.id.desc())
+        ).label('recency')
+    ).subquery()
+    rows = db.session.query(
+        ranked.c.user_id,
+        ranked.c.quiz_id,
+        ranked.c.best_score,
+        ranked.c.attempt_count,
+        ranked.c.completed_at,
+        ranked.c.score,
+        ranked.c.total_questions
+    ).filter(ranked.c.recency == 1)
+    
+    existing = {
+        (user_id, quiz_id): summary_id for summary_id, user_id, quiz_id in
+        db.session.query(UserQuizSummary.id, UserQuizSummary.user_id, UserQuizSummary.quiz_id)
+    }
+    
+    built = 0
+    for user_id, quiz_id, best_score, attempt_count, last_completed_at, last_score, last_total in rows:
+        if (user_id, quiz_id) in existing:
+            if missing_only:
+                continue
+            summary = db.session.get(UserQuizSummary, existing[(user_id, quiz_id)])
+        else:
+            summary = UserQuizSummary(user_id=user_id, quiz_id=quiz_id)
+            db.session.add(summary)
+        summary.best_score = best_score
+        summary.last_score = last_score
+        summary.last_total = last_total
+        summary.attempt_count = attempt_count
+        summary.last_completed_at = last_completed_at
+        built += 1
+    
     db.session.commit()
+    return built
+
+def rebuild_leaderboards(weeks=4):
+    """
+    Full leaderboard rebuild for consistency.
+    This function:
+    - Raises all-time quiz entries to the best percentage in the attempt log
+      (entries are only raised, so attempts already archived are kept)
+    - Recomputes the weekly quiz boards of the last `weeks` ISO weeks
+    - Recomputes every category board of those periods from the quiz boards
+    Works one quiz at a time so memory stays bounded by the number of users.
+    """
+    percentage = db.case(
+        (QuizProgress.total_questions > 0, QuizProgress.score * 100 / QuizProgress.total_questions),
+        else_=0
+    )
+    today = datetime.utcnow()
+    week_starts = [
+        datetime(today.year, today.month, today.day) - timedelta(days=today.weekday(), weeks=offset)
+        for offset in range(weeks)
+    ]
+    weekly_periods = [week_period(start) for start in week_starts]
+    quizzes = Quiz.query.all()
     
-    return jsonify({'success': True})
+    LeaderboardEntry.query.filter(LeaderboardEntry.period.in_(weekly_periods)).delete(synchronize_session=False)
+    
+    rebuilt = 0
+    for quiz in quizzes:
+        board_key = str(quiz.id)
+        best_all_time = db.session.query(QuizProgress.user_id, db.func.max(percentage)).filter(
+            QuizProgress.quiz_id == quiz.id
+        ).group_by(QuizProgress.user_id)
+        existing = {
+            entry.user_id: entry for entry in
+            LeaderboardEntry.query.filter_by(board_type='quiz', board_key=board_key, period='all')
+        }
+        for user_id, best in best_all_time:
+            entry = existing.get(user_id)
+            if entry is None:
+                db.session.add(LeaderboardEntry(
+                    board_type='quiz', board_key=board_key, period='all', user_id=user_id, score=int(best)
+                ))
+            elif int(best) > (entry.score or 0):
+                entry.score = int(best)
+            rebuilt += 1
+        
+        for start, period in zip(week_starts, weekly_periods):
+            best_in_week = db.session.query(QuizProgress.user_id, db.func.max(percentage)).filter(
+                QuizProgress.quiz_id == quiz.id,
+                QuizProgress.completed_at >= start,
+                QuizProgress.completed_at < start + timedelta(weeks=1)
+            ).group_by(QuizProgress.user_id)
+            db.session.add_all(
+                LeaderboardEntry(board_type='quiz', board_key=board_key, period=period, user_id=user_id, score=int(best))
+                for user_id, best in best_in_week
+            )
+        db.session.commit()
+    
+    # Category boards are sums over their quiz boards
+    quiz_ids_by_category = {}
+    for quiz in quizzes:
+        if quiz.category:
+            quiz_ids_by_category.setdefault(quiz.category, []).append(str(quiz.id))
+    
+    for period in ['all'] + weekly_periods:
+        LeaderboardEntry.query.filter_by(board_type='category', period=period).delete(synchronize_session=False)
+        for category, quiz_keys in quiz_ids_by_category.items():
+            totals = db.session.query(LeaderboardEntry.user_id, db.func.sum(LeaderboardEntry.score)).filter(
+                LeaderboardEntry.board_type == 'quiz',
+                LeaderboardEntry.board_key.in_(quiz_keys),
+                LeaderboardEntry.period == period
+            ).group_by(LeaderboardEntry.user_id)
+            db.session.add_all(
+                LeaderboardEntry(board_type='category', board_key=category, period=period, user_id=user_id, score=int(total))
+                for user_id, total in totals
+            )
+        db.session.commit()
+    
+    bump_leaderboard_generation()
+    return {'quiz_entries': rebuilt, 'weekly_periods': weekly_periods}
 
-def import_all_quizzes():
+def migrate_phone_numbers(batch_size=5000):
+    """
+    Add and backfill User.phone_e164 on databases created before it existed.
+    Numbers that cannot be normalized, or that normalize to a number another
+    user already has, are left empty and reported for manual review.
+    """
+    columns = {column['name'] for column in db.inspect(db.engine).get_columns('user')}
+    column_added = 'phone_e164' not in columns
+    if column_added:
+        db.session.execute(db.text('ALTER TABLE "user" ADD COLUMN phone_e164 VARCHAR(16)'))
+    # Before the backfill, so the conflict checks below are index lookups (NULLs do not collide)
+    db.session.execute(db.text('CREATE UNIQUE INDEX IF NOT EXISTS ix_user_phone_e164 ON "user" (phone_e164)'))
+    db.session.commit()
+    
+    normalized = 0
+    unparseable = []
+    conflicts = []
+    last_id = 0
+    while True:
+        batch = db.session.query(User.id, User.phone_number).filter(
+            User.phone_e164.is_(None), User.id > last_id
+        ).order_by(User.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        
+        candidates = {}
+        for user_id, phone_number in batch:
+            phone = normalize_phone(phone_number, PHONE_COUNTRY_CODE)
+            if phone is None:
+                unparseable.append((user_id, phone_number))
+            elif phone in candidates:
+                conflicts.append((user_id, phone_number, candidates[phone][0]))
+            else:
+                candidates[phone] = (user_id, phone_number)
+        for phone, user_id in db.session.query(User.phone_e164, User.id).filter(User.phone_e164.in_(candidates)):
+            conflicts.append(candidates.pop(phone) + (user_id,))
+        
+        if candidates:
+            db.session.execute(db.update(User), [
+                {'id': user_id, 'phone_e164': phone} for phone, (user_id, _) in candidates.items()
+            ])
+        db.session.commit()
+        normalized += len(candidates)
+    
+    _phone_filter['filter'] = None
+    
+    return {
+        'column_added': column_added,
+        'normalized': normalized,
+        'unparseable': unparseable,  # [(user_id, phone_number)]
+        'conflicts': conflicts  # [(user_id, phone_number, id of the user who has the number)]
+    }
+
+def compact_quiz_progress(retention_days=90, batch_size=5000):
+    """
+    Periodic compaction of the QuizProgress log.
+    This function:
+    - Makes sure every (user, quiz) pair with attempts has a summary
+    - Moves attempts older than the retention window into compressed
+      QuizProgressArchive chunks, one chunk per (user, quiz) per batch
+    - Works in batches so memory stays bounded on large logs
+    """
+    summaries_built = rebuild_quiz_summaries(missing_only=True)
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    
+    archived = 0
+    chunks = 0
+    while True:
+        batch = QuizProgress.query.filter(QuizProgress.completed_at < cutoff).order_by(
+            QuizProgress.user_id, QuizProgress.quiz_id, QuizProgress.id
+        ).limit(batch_size).all()
+        if not batch:
+            break
+        
+        groups = {}
+        for record in batch:
+            groups.setdefault((record.user_id, record.quiz_id), []).append(record)
+        
+        for (user_id, quiz_id), records in groups.items():
+            attempts = [{
+                'id': record.id,
+                'score': record.score,
+                'total_questions': record.total_questions,
+                'completed_at': record.completed_at.isoformat() if record.completed_at else None
+            } for record in records]
+            completed = [record.completed_at for record in records if record.completed_at]
+            db.session.add(QuizProgressArchive(
+                user_id=user_id,
+                quiz_id=quiz_id,
+                attempt_count=len(records),
+                first_completed_at=min(completed) if completed else None,
+                last_completed_at=max(completed) if completed else None,
+                payload=zlib.compress(json.dumps(attempts).encode('utf-8'))
+            ))
+            chunks += 1
+        
+        QuizProgress.query.filter(QuizProgress.id.in_([record.id for record in batch])).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(batch)
+    
+    return {
+        'summaries_built': summaries_built,
+        'archived_attempts': archived,
+        'archive_chunks': chunks,
+        'cutoff': cutoff
+    }
+
+def parse_translation_row(row):
+    """Convert one row of a translated CSV into QuestionTranslation text values"""
+    fields = {
+        'question_text': row.get('question'),
+        'option_a': row.get('option_a'),
+        'option_b': row.get('option_b'),
+        'option_c': row.get('option_c'),
+        'option_d': row.get('option_d'),
+        'option_e': row.get('option_e')
+    }
+    return {field: value.strip() if value and value.strip() else None for field, value in fields.items()}
+
+def split_translation_filename(filename):
+    """'Cardiologie.ro' -> ('Cardiologie', 'ro'); other names -> (filename, None)"""
+    base, _, language = filename.rpartition('.')
+    if base and language in SUPPORTED_LANGUAGES and language != DEFAULT_LANGUAGE:
+        return base, language
+    return filename, None
+
+def parse_question_row(row):
+    """Convert one CSV row into Question column values"""
+    def optional(field):
+        value = row.get(field)
+        return value.strip() if value and value.strip() else None
+    
+    return {
+        'translations': {},
+        'question_text': row['question'].strip(),
+        'option_a': row['option_a'].strip(),
+        'option_b': row['option_b'].strip(),
+        'option_c': optional('option_c'),
+        'option_d': optional('option_d'),
+        'option_e': optional('option_e'),
+        'correct_answers': row['correct_answers'].strip()
+    }
+
+def find_duplicate_questions(staged, threshold=DUPLICATE_THRESHOLD):
+    """
+    Group near-duplicate questions across all staged quizzes.
+    Returns clusters of (quiz position, row position) keys in import order.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    for quiz_pos, (quiz_info, rows) in enumerate(staged):
+        for row_pos, row in enumerate(rows):
+            options = [row[f'option_{letter}'] for letter in 'abcde']
+            index.add((quiz_pos, row_pos), row['question_text'], options)
+    return index.clusters()
+
+def correct_option_texts(row):
+    """Normalized texts of the correct options, so answers compare across reordered options"""
+    letters = [letter.strip().lower() for letter in row['correct_answers'].split(',')]
+    return frozenset(
+        normalize_text(row[f'option_{letter}']) for letter in letters
+        if row.get(f'option_{letter}')
+    )
+
+def resolve_duplicate_questions(staged, clusters, merge_scope=None):
+    """
+    Classify near-duplicate clusters and optionally merge them.
+    merge_scope is None (report only), 'within' (merge copies inside the same
+    quiz) or 'all' (also merge copies across quizzes). The first copy is kept;
+    later copies are only dropped when their correct answers agree with it.
+    Conflicting answers are reported across all quizzes whatever the scope;
+    stats['conflicts'] lists the (cluster index, key) of each copy that
+    disagrees with the first copy of its cluster.
+    """
+    stats = {
+        'clusters': len(clusters),
+        'within_quiz_clusters': 0,
+        'cross_quiz_clusters': 0,
+        'conflicting_answers': 0,
+        'cross_quiz_conflicts': 0,
+        'conflicts': [],
+        'merged': 0
+    }
+    dropped = set()
+    
+    for cluster_index, cluster in enumerate(clusters):
+        quiz_positions = {quiz_pos for quiz_pos, _ in cluster}
+        if len(quiz_positions) < len(cluster):
+            stats['within_quiz_clusters'] += 1
+        if len(quiz_positions) > 1:
+            stats['cross_quiz_clusters'] += 1
+        
+        first_quiz_pos, first_answers = None, None
+        kept = {}
+        for key in cluster:
+            quiz_pos, row_pos = key
+            answers = correct_option_texts(staged[quiz_pos][1][row_pos])
+            if first_answers is None:
+                first_quiz_pos, first_answers = quiz_pos, answers
+            elif answers != first_answers:
+                stats['conflicting_answers'] += 1
+                if quiz_pos != first_quiz_pos:
+                    stats['cross_quiz_conflicts'] += 1
+                stats['conflicts'].append((cluster_index, key))
+            
+            scope_key = None if merge_scope == 'all' else quiz_pos
+            if scope_key not in kept:
+                kept[scope_key] = answers
+            elif merge_scope and answers == kept[scope_key]:
+                dropped.add(key)
+    
+    if dropped:
+        for quiz_pos, (quiz_info, rows) in enumerate(staged):
+            rows[:] = [row for row_pos, row in enumerate(rows) if (quiz_pos, row_pos) not in dropped]
+        stats['merged'] = len(dropped)
+    
+    return stats
+
+def print_duplicate_report(staged, clusters, stats, limit=10):
+    """Print the near-duplicate summary and the first few clusters"""
+    print(f"Near-duplicate questions: {stats['clusters']} clusters "
+          f"({stats['within_quiz_clusters']} within a quiz, {stats['cross_quiz_clusters']} across quizzes)")
+    if stats['conflicting_answers']:
+        print(f"   WARNING: {stats['conflicting_answers']} near-duplicates disagree on the correct answers "
+              f"({stats['cross_quiz_conflicts']} across quizzes)")
+    if stats['merged']:
+        print(f"   MERGED: Dropped {stats['merged']} duplicate questions")
+    
+    def describe(cluster):
+        return ', '.join(f"{staged[quiz_pos][0]['title']} #{row_pos + 1}" for quiz_pos, row_pos in cluster)
+    
+    for cluster in clusters[:limit]:
+        print(f"   - {describe(cluster)}")
+    if len(clusters) > limit:
+        print(f"   ... and {len(clusters) - limit} more")
+    
+    conflicting = sorted({cluster_index for cluster_index, _ in stats['conflicts']})
+    if conflicting:
+        print("   Conflicting answers:")
+        for cluster_index in conflicting[:limit]:
+            print(f"   - {describe(clusters[cluster_index])}")
+        if len(conflicting) > limit:
+            print(f"   ... and {len(conflicting) - limit} more")
+    print()
+
+def import_all_quizzes(merge_duplicates=None, duplicate_threshold=DUPLICATE_THRESHOLD):
     """
     Comprehensive import of all quiz data from CSV files.
     This function:
     - Finds all CSV files in csv_files folder (including subfolders)
     - Maps each CSV to the appropriate quiz topic
+    - Attaches parallel translated CSVs (e.g. Cardiologie.ro.csv, same rows
+      in the same order) as per-language question text
+    - Reports near-duplicate questions within and across quizzes (banks
+      without a mapping are indexed too, but not imported), and merges them
+      when merge_duplicates is 'within' or 'all'
     - Deletes old questions and imports new ones
+    - Bumps the catalog version, precompiles per-language payloads and writes
+      the memory-mapped question bundles
     - Reports import status
     """
     
@@ -793,11 +2531,24 @@ def import_all_quizzes():
         'details': []
     }
     
-    # Import each CSV file
+    # Parallel translated CSVs, keyed by the base filename
+    translation_files = {}
+    for csv_path in csv_files:
+        base, language = split_translation_filename(os.path.splitext(os.path.basename(csv_path))[0])
+        if language:
+            translation_files.setdefault(base, {})[language] = csv_path
+    
+    # Read each CSV file; banks without a mapping are only read for the duplicate report
+    staged = []
+    unmapped = []
     for csv_path in sorted(csv_files):
         # Get filename without extension
         filename = os.path.splitext(os.path.basename(csv_path))[0]
         
+        # Translations are read together with their base file
+        if split_translation_filename(filename)[1]:
+            continue
+        
         # Skip non-quiz files
         if filename in ['PROCESSING_COMPLETE', 'Nephrology_ENG_Examen_de_Stat']:
             continue
@@ -806,16 +2557,51 @@ def import_all_quizzes():
         quiz_info = quiz_mapping.get(filename)
         
         if not quiz_info:
-            print(f"WARNING: Skipping {filename} - no mapping found")
+            print(f"WARNING: Not importing {filename} - no mapping found (checked for duplicates only)")
+        
+        try:
+            with open(csv_path, 'r', encoding='utf-8') as f:
+                rows = [parse_question_row(row) for row in csv.DictReader(f)]
+            
+            for language, translation_path in translation_files.get(filename, {}).items():
+                with open(translation_path, 'r', encoding='utf-8') as f:
+                    translated_rows = [parse_translation_row(row) for row in csv.DictReader(f)]
+                if len(translated_rows) != len(rows):
+                    print(f"WARNING: {os.path.basename(translation_path)} has {len(translated_rows)} rows, "
+                          f"expected {len(rows)} - unmatched rows fall back to English")
+                for row, translated in zip(rows, translated_rows):
+                    row['translations'][language] = translated
+        except Exception as e:
+            print(f"ERROR: Could not read {filename}: {str(e)}")
             import_stats['failed'] += 1
             continue
         
+        if quiz_info:
+            staged.append((quiz_info, rows))
+        else:
+            unmapped.append(({'title': filename}, rows))
+            import_stats['failed'] += 1
+    
+    # Detect near-duplicate questions within and across all banks. Unmapped
+    # banks go last, so a copy that is imported is always the one kept
+    banks = staged + unmapped
+    clusters = find_duplicate_questions(banks, threshold=duplicate_threshold)
+    import_stats['duplicates'] = resolve_duplicate_questions(banks, clusters, merge_scope=merge_duplicates)
+    print_duplicate_report(banks, clusters, import_stats['duplicates'])
+    
+    # Import each quiz
+    for quiz_info, rows in staged:
         try:
             # Find or create quiz
             quiz = Quiz.query.filter_by(title=quiz_info['title']).first()
             
             if quiz:
-                # Delete old questions
+                # Delete old questions with their translations, ratings and recent answers (SQLite
+                # reuses the ids, so a leftover row would attach to an unrelated new question)
+                old_question_ids = db.session.query(Question.id).filter_by(quiz_id=quiz.id)
+                QuestionTranslation.query.filter(QuestionTranslation.question_id.in_(old_question_ids)).delete(synchronize_session=False)
+                QuestionRating.query.filter(QuestionRating.question_id.in_(old_question_ids)).delete(synchronize_session=False)
+                AnsweredQuestion.query.filter(AnsweredQuestion.question_id.in_(old_question_ids)).delete(synchronize_session=False)
                 Question.query.filter_by(quiz_id=quiz.id).delete()
                 print(f"UPDATING: {quiz_info['title']}")
             else:
@@ -830,24 +2616,19 @@ def import_all_quizzes():
                 db.session.flush()
                 print(f"CREATING: {quiz_info['title']}")
             
-            # Import questions from CSV
+            # Import questions
             questions_imported = 0
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                csv_reader = csv.DictReader(f)
-                for i, row in enumerate(csv_reader):
-                    question = Question(
-                        quiz_id=quiz.id,
-                        order_num=i,
-                        question_text=row['question'].strip(),
-                        option_a=row['option_a'].strip(),
-                        option_b=row['option_b'].strip(),
-                        option_c=row['option_c'].strip() if row.get('option_c') and row['option_c'].strip() else None,
-                        option_d=row['option_d'].strip() if row.get('option_d') and row['option_d'].strip() else None,
-                        option_e=row['option_e'].strip() if row.get('option_e') and row['option_e'].strip() else None,
-                        correct_answers=row['correct_answers'].strip()
-                    )
-                    db.session.add(question)
-                    questions_imported += 1
+            for i, row in enumerate(rows):
+                question = Question(
+                    quiz_id=quiz.id,
+                    order_num=i,
+                    correct_answers=row['correct_answers'],
+                    **{field: row[field] for field in QUESTION_TEXT_FIELDS}
+                )
+                for language, translated in row['translations'].items():
+                    question.translations.append(QuestionTranslation(language=language, **translated))
+                db.session.add(question)
+                questions_imported += 1
             
             db.session.commit()
             
@@ -889,11 +2670,22 @@ def import_all_quizzes():
     
     print(f"\n{'='*60}\n")
     
+    # Invalidate and precompile the per-language payloads and question bundles
+    import_stats['catalog_version'] = bump_catalog_version()
+    compile_all_quiz_payloads()
+    import_stats['bundles'] = write_question_bundles()
+    
     return import_stats
 
+# Opt-in request profiling (QUIZ_PROFILE=1); views are only wrapped when enabled,
+# so this must stay below the last route
+request_profiler = init_profiling(app)
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        migrate_phone_numbers()
         import_all_quizzes()
+        rebuild_quiz_summaries(missing_only=True)
     
     app.run(debug=True)
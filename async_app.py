@@ -0,0 +1,323 @@
+"""
+ASGI serving mode for the cheap, high-frequency endpoints.
+The async app shares the models and session cookie of the Flask app and
+serves these routes on an async database driver:
+
+- POST /check_phone
+- GET  /get_home_page
+- GET  /quiz_details/<quiz_id>
+- POST /submit_quiz
+
+Every other path is passed through to the Flask app in a thread pool, so the
+ASGI app can replace the WSGI server entirely:
+
+    pip install -r requirements-async.txt
+    uvicorn async_app:app --workers 4
+
+QUIZ_ASYNC_DATABASE_URI overrides the async database URL, which is otherwise
+derived from the Flask app's (sqlite -> sqlite+aiosqlite).
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import (
+    app as flask_app, db, User, Quiz, QuizProgress, QuizSession, UserQuizSummary, LeaderboardEntry, OfflineAttempt,
+    apply_attempt_to_summary, apply_leaderboard_attempt, attempt_percentage, leaderboard_periods,
+    question_type_counts_statement, normalize_phone, PHONE_COUNTRY_CODE, PHONE_FILTER_REFRESH,
+    PHONE_FILTER_ERROR_RATE, valid_attempt, valid_client_id, logged_attempts_statement, new_quiz_summary,
+)
+from phone_lookup import BloomFilter
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_url():
+    """Async driver URL for the database the Flask app uses"""
+    if os.environ.get('QUIZ_ASYNC_DATABASE_URI'):
+        return os.environ['QUIZ_ASYNC_DATABASE_URI']
+    with flask_app.app_context():
+        url = db.engine.url
+    backend = url.drivername.split('+')[0]
+    return url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+
+
+# Requests wait for a pooled connection instead of opening one each, so the
+# pool size (not the worker count) bounds concurrent database work
+engine = create_async_engine(
+    async_database_url(),
+    pool_size=int(os.environ.get('QUIZ_ASYNC_POOL_SIZE', 20)),
+    max_overflow=0
+)
+Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def current_user_id(request):
+    """User id from the Flask session cookie, or None when not logged in"""
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not cookie:
+        return None
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        data = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+    user_id = data.get('_user_id')
+    return int(user_id) if user_id else None
+
+
+def login_required_response():
+    return JSONResponse({'error': 'Login required'}, status_code=401)
+
+
+async def json_body(request):
+    """The request's JSON object, or None when the body is not one"""
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def invalid_data_response():
+    return JSONResponse({'error': 'Invalid data'}, status_code=400)
+
+
+# Same scheme as the Flask app's filter: built on first use, topped up with
+# newly registered users (by id) at most every PHONE_FILTER_REFRESH seconds.
+# The build and the top-up hold a lock, so concurrent requests neither build
+# the filter twice nor read users into it twice
+_phone_filter = {'filter': None, 'max_user_id': 0, 'refreshed_at': 0.0}
+_phone_filter_lock = asyncio.Lock()
+
+
+def phone_filter_stale():
+    phone_filter = _phone_filter['filter']
+    return (
+        phone_filter is None or phone_filter.count > phone_filter.capacity
+        or time.monotonic() - _phone_filter['refreshed_at'] > PHONE_FILTER_REFRESH
+    )
+
+
+async def get_phone_filter(session):
+    if not phone_filter_stale():
+        return _phone_filter['filter']
+    async with _phone_filter_lock:
+        if not phone_filter_stale():
+            return _phone_filter['filter']
+        phone_filter = _phone_filter['filter']
+        if phone_filter is None or phone_filter.count > phone_filter.capacity:
+            count = await session.scalar(select(db.func.count(User.id)))
+            phone_filter = BloomFilter(max(10000, 2 * count), PHONE_FILTER_ERROR_RATE)
+            max_user_id = 0
+        else:
+            max_user_id = _phone_filter['max_user_id']
+        rows = await session.stream(
+            select(User.id, User.phone_e164).where(User.id > max_user_id).order_by(User.id)
+        )
+        async for user_id, phone in rows:
+            if phone:
+                phone_filter.add(phone)
+            max_user_id = user_id
+        # A new filter is published only once filled, so requests that skip the lock never see it half built
+        _phone_filter.update(filter=phone_filter, max_user_id=max_user_id, refreshed_at=time.monotonic())
+    return phone_filter
+
+
+async def check_phone(request):
+    """Check if phone number exists and return account status"""
+    data = await json_body(request)
+    if data is None:
+        return invalid_data_response()
+    phone = normalize_phone(data.get('phone_number'), PHONE_COUNTRY_CODE)
+
+    row = None
+    async with Session() as session:
+        if phone is not None and phone in await get_phone_filter(session):
+            row = (await session.execute(
+                select(User.name, User.password_hash).where(User.phone_e164 == phone).limit(1)
+            )).first()
+
+    if not row:
+        return JSONResponse({'exists': False, 'message': 'No account found with this phone number'})
+
+    return JSONResponse({
+        'exists': True,
+        'has_password': row.password_hash is not None,
+        'name': row.name
+    })
+
+
+async def get_home_page(request):
+    """Get user's saved home page"""
+    user_id = current_user_id(request)
+    if user_id is None:
+        return login_required_response()
+
+    async with Session() as session:
+        locked_home_page = await session.scalar(select(User.locked_home_page).where(User.id == user_id))
+
+    if locked_home_page:
+        try:
+            return JSONResponse({'success': True, 'data': json.loads(locked_home_page)})
+        except ValueError:
+            pass
+    return JSONResponse({'success': False, 'data': None})
+
+
+async def quiz_details(request):
+    """Get quiz details for the settings modal"""
+    if current_user_id(request) is None:
+        return login_required_response()
+    quiz_id = request.path_params['quiz_id']
+
+    async with Session() as session:
+        quiz = (await session.execute(
+            select(Quiz.id, Quiz.title, Quiz.description).where(Quiz.id == quiz_id)
+        )).first()
+        if not quiz:
+            return JSONResponse({'error': 'Not found'}, status_code=404)
+        total_questions, multiple_answer_count = (await session.execute(question_type_counts_statement(quiz_id))).one()
+
+    return JSONResponse({
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'total_questions': total_questions,
+        'single_answer_count': total_questions - multiple_answer_count,
+        'multiple_answer_count': multiple_answer_count
+    })
+
+
+async def get_leaderboard_entry(session, board_type, board_key, period, user_id):
+    """Load or create (unsaved) a user's entry on a board"""
+    entry = await session.scalar(select(LeaderboardEntry).where(
+        LeaderboardEntry.board_type == board_type,
+        LeaderboardEntry.board_key == board_key,
+        LeaderboardEntry.period == period,
+        LeaderboardEntry.user_id == user_id
+    ))
+    if not entry:
+        entry = LeaderboardEntry(board_type=board_type, board_key=board_key, period=period, user_id=user_id, score=0)
+        session.add(entry)
+    return entry
+
+
+async def client_attempt_recorded(session, user_id, client_id):
+    """Whether an attempt with this client id was already recorded"""
+    return await session.scalar(select(OfflineAttempt.id).where(
+        OfflineAttempt.user_id == user_id, OfflineAttempt.client_id == client_id
+    )) is not None
+
+
+async def record_quiz_submission(user_id, quiz, score, total, session_id, completed_at, client_id):
+    """Record one attempt in its own transaction; returns False when client_id was already recorded"""
+    async with Session() as session:
+        if client_id is not None:
+            if await client_attempt_recorded(session, user_id, client_id):
+                return False
+            session.add(OfflineAttempt(user_id=user_id, client_id=client_id, synced_at=completed_at))
+
+        # The summary goes first: a missing one is seeded from the attempts logged before this one
+        summary = await session.scalar(
+            select(UserQuizSummary).where(UserQuizSummary.user_id == user_id, UserQuizSummary.quiz_id == quiz.id)
+        )
+        if not summary:
+            logged_attempts = (await session.execute(logged_attempts_statement(user_id, quiz.id))).all()
+            summary = new_quiz_summary(user_id, quiz.id, logged_attempts)
+            session.add(summary)
+        apply_attempt_to_summary(summary, score, total, completed_at)
+
+        session.add(QuizProgress(
+            user_id=user_id,
+            quiz_id=quiz.id,
+            score=score,
+            total_questions=total,
+            completed_at=completed_at
+        ))
+
+        percentage = attempt_percentage(score, total)
+        for period in leaderboard_periods(completed_at):
+            quiz_entry = await get_leaderboard_entry(session, 'quiz', str(quiz.id), period, user_id)
+            category_entry = None
+            if quiz.category:
+                category_entry = await get_leaderboard_entry(session, 'category', quiz.category, period, user_id)
+            apply_leaderboard_attempt(quiz_entry, category_entry, percentage)
+
+        if session_id:
+            quiz_session = await session.scalar(
+                select(QuizSession).where(QuizSession.id == session_id, QuizSession.user_id == user_id)
+            )
+            if quiz_session and not quiz_session.completed_at:
+                quiz_session.cursor = quiz_session.total_questions
+                quiz_session.score = score
+                quiz_session.completed_at = completed_at
+
+        await session.commit()
+    return True
+
+
+async def submit_quiz(request):
+    """Submit quiz results"""
+    user_id = current_user_id(request)
+    if user_id is None:
+        return login_required_response()
+
+    data = await json_body(request)
+    if data is None:
+        return invalid_data_response()
+    quiz_id = data.get('quiz_id')
+    score = data.get('score')
+    total = data.get('total')
+    session_id = data.get('session_id')  # Optional - quiz session being finished
+    client_id = data.get('client_id')  # Optional - makes a retried submit count once
+
+    if not valid_attempt(quiz_id, score, total) or not (client_id is None or valid_client_id(client_id)):
+        return invalid_data_response()
+
+    async with Session() as session:
+        quiz = (await session.execute(select(Quiz.id, Quiz.category).where(Quiz.id == quiz_id))).first()
+    if not quiz:
+        return JSONResponse({'error': 'Quiz not found'}, status_code=404)
+
+    for retry in range(2):
+        try:
+            recorded = await record_quiz_submission(
+                user_id, quiz, score, total, session_id, datetime.utcnow(), client_id
+            )
+            break
+        except IntegrityError:
+            # A concurrent request recorded the same attempt (or created the summary
+            # first); the retry sees its rows
+            if retry:
+                raise
+    if not recorded:
+        return JSONResponse({'success': True, 'duplicate': True})
+
+    return JSONResponse({'success': True})
+
+
+app = Starlette(routes=[
+    Route('/check_phone', check_phone, methods=['POST']),
+    Route('/get_home_page', get_home_page, methods=['GET']),
+    Route('/quiz_details/{quiz_id:int}', quiz_details, methods=['GET']),
+    Route('/submit_quiz', submit_quiz, methods=['POST']),
+    # Everything else is served by the Flask app
+    Mount('/', app=WSGIMiddleware(flask_app)),
+])
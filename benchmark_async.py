@@ -0,0 +1,118 @@
+"""
+Benchmark the sync (WSGI) and async (ASGI) serving modes side by side.
+Start both servers against the same database, e.g.:
+
+    gunicorn -w 4 -b 127.0.0.1:8000 app:app
+    uvicorn async_app:app --workers 4 --port 8001
+
+then run:
+
+    python benchmark_async.py --sync http://127.0.0.1:8000 --async http://127.0.0.1:8001 \\
+        --endpoint check_phone --concurrency 1000 --requests 20000
+
+Authenticated endpoints use a session cookie minted for --user-id with the
+app's secret key, so no login round trip is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import app as flask_app
+
+ENDPOINTS = {
+    'check_phone': ('POST', '/check_phone', {'phone_number': '+40700000000'}),
+    'get_home_page': ('GET', '/get_home_page', None),
+    'quiz_details': ('GET', '/quiz_details/1', None),
+    'submit_quiz': ('POST', '/submit_quiz', {'quiz_id': 1, 'score': 10, 'total': 20}),
+}
+
+
+def session_cookie(user_id):
+    """Signed Flask session cookie of a logged-in user"""
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    return {flask_app.config['SESSION_COOKIE_NAME']: serializer.dumps({'_user_id': str(user_id), '_fresh': True})}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(base_url, endpoint, concurrency, total_requests, user_id):
+    """Fire total_requests with at most `concurrency` in flight; return stats"""
+    method, path, body = ENDPOINTS[endpoint]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies = []
+    errors = 0
+    remaining = iter(range(total_requests))
+
+    async with httpx.AsyncClient(base_url=base_url, cookies=session_cookie(user_id), limits=limits,
+                                 timeout=60.0) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync and async serving modes')
+    parser.add_argument('--sync', dest='sync_url', help='Base URL of the WSGI server')
+    parser.add_argument('--async', dest='async_url', help='Base URL of the ASGI server')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='check_phone')
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--user-id', type=int, default=1, help='User for authenticated endpoints')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    targets = [(name, url) for name, url in (('sync', args.sync_url), ('async', args.async_url)) if url]
+    if not targets:
+        parser.error('pass --sync and/or --async')
+
+    results = {}
+    for name, url in targets:
+        results[name] = asyncio.run(run(url, args.endpoint, args.concurrency, args.requests, args.user_id))
+
+    if args.json:
+        print(json.dumps({'endpoint': args.endpoint, 'concurrency': args.concurrency, 'results': results}, indent=2))
+        return
+
+    print(f"\nEndpoint: {args.endpoint}  Concurrency: {args.concurrency}  Requests: {args.requests}\n")
+    print(f"{'mode':<6} {'rps':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10} {'errors':>8}")
+    for name, stats in results.items():
+        print(f"{name:<6} {stats['rps']:>10} {stats['p50_ms']:>10} {stats['p95_ms']:>10} "
+              f"{stats['p99_ms']:>10} {stats['max_ms']:>10} {stats['errors']:>8}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
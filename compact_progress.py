@@ -0,0 +1,35 @@
+"""
+Periodic compaction of quiz attempts.
+Run this script (e.g. nightly from cron) to keep the QuizProgress table small:
+attempts older than the retention window are moved into compressed archive
+chunks, while the per-user per-quiz summaries keep best/last scores.
+
+Usage: python compact_progress.py [retention_days]
+"""
+
+import sys
+
+from app import app, db, compact_quiz_progress
+
+if __name__ == '__main__':
+    retention_days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+
+    with app.app_context():
+        # Ensure summary and archive tables exist
+        db.create_all()
+
+        print("\n" + "="*60)
+        print("QUIZ PROGRESS COMPACTION")
+        print("="*60)
+        print(f"\nRetention window: {retention_days} days")
+
+        stats = compact_quiz_progress(retention_days=retention_days)
+
+        print(f"Archiving attempts completed before: {stats['cutoff']:%Y-%m-%d %H:%M}")
+        print(f"Summaries built: {stats['summaries_built']}")
+        print(f"Attempts archived: {stats['archived_attempts']}")
+        print(f"Archive chunks written: {stats['archive_chunks']}")
+
+        print("\n" + "="*60)
+        print("COMPACTION COMPLETE")
+        print("="*60 + "\n")
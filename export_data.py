@@ -0,0 +1,46 @@
+"""
+Export users, quiz attempts or per-quiz stats as CSV or NDJSON.
+Rows are streamed from the database in batches, so exports of any size run
+in constant memory. The same exports are served to admins at
+/admin/export/<kind>.
+
+Usage:
+    python export_data.py attempts --format ndjson --category Pediatrics \\
+        --start 2026-01-01 --end 2026-03-31 --include-archived -o attempts.ndjson
+"""
+
+import argparse
+import sys
+
+from app import app, EXPORTS, EXPORT_FORMATS, parse_export_date, stream_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream an export of the quiz database')
+    parser.add_argument('kind', choices=sorted(EXPORTS))
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--category', help='Only quizzes of this category')
+    parser.add_argument('--start', type=parse_export_date, help='From this date (YYYY-MM-DD, inclusive)')
+    parser.add_argument('--end', type=parse_export_date, help='Up to this date (YYYY-MM-DD, inclusive)')
+    parser.add_argument('--include-archived', action='store_true', help='Also export compacted attempts')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        with app.app_context():
+            rows = EXPORTS[args.kind](
+                category=args.category,
+                start=args.start,
+                end=args.end,
+                include_archived=args.include_archived
+            )
+            for chunk in stream_export(rows, args.format):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Synthetic data generator for scale testing.
+Creates a separate SQLite database with the app's schema, copies the quiz
+catalog from the app database and fills it with realistic users, quiz
+attempts and per-user quiz summaries.
+
+The output is fully determined by --seed, so timings taken against two
+generated databases with the same arguments are comparable.
+
+Usage:
+    python generate_synthetic_data.py instance/scale.db --users 1000000 --attempts 50000000
+    QUIZ_DATABASE_URI=sqlite:///scale.db python app.py
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+
+from app import app, db
+
+BATCH_SIZE = 50000  # Rows per executemany call
+COMMIT_EVERY = 2000000  # Rows per transaction
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.000000'
+
+
+def open_database(path):
+    """Create the schema in a fresh database and relax durability for bulk loading"""
+    if os.path.exists(path):
+        raise SystemExit(f"{path} already exists - refusing to overwrite it")
+
+    engine = create_engine(f'sqlite:///{os.path.abspath(path)}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA cache_size = -262144')  # 256 MB
+    conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+    return conn
+
+
+def copy_catalog(conn, source_path):
+    """Copy quizzes and questions from the app database, return [(quiz_id, question_count)]"""
+    conn.execute('ATTACH DATABASE ? AS source', (source_path,))
+    conn.execute('BEGIN')
+    conn.execute('INSERT INTO quiz SELECT * FROM source.quiz')
+    conn.execute('INSERT INTO question SELECT * FROM source.question')
+    conn.execute('COMMIT')
+    conn.execute('DETACH DATABASE source')
+
+    return conn.execute(
+        'SELECT quiz.id, COUNT(question.id) FROM quiz '
+        'LEFT JOIN question ON question.quiz_id = quiz.id '
+        'WHERE quiz.is_beta = 0 OR quiz.is_beta IS NULL '
+        'GROUP BY quiz.id ORDER BY quiz.id'
+    ).fetchall()
+
+
+def bulk_insert(conn, sql, rows, label, total):
+    """Insert rows from a generator in large transactions and report throughput"""
+    started = time.perf_counter()
+    inserted = 0
+    in_transaction = 0
+    batch = []
+
+    conn.execute('BEGIN')
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.executemany(sql, batch)
+            inserted += len(batch)
+            in_transaction += len(batch)
+            batch = []
+            if in_transaction >= COMMIT_EVERY:
+                conn.execute('COMMIT')
+                conn.execute('BEGIN')
+                in_transaction = 0
+                elapsed = time.perf_counter() - started
+                print(f"  {label}: {inserted:,}/{total:,} ({inserted / elapsed * 60:,.0f} rows/min)")
+    if batch:
+        conn.executemany(sql, batch)
+        inserted += len(batch)
+    conn.execute('COMMIT')
+
+    elapsed = time.perf_counter() - started
+    rate = inserted / elapsed * 60 if elapsed else 0
+    print(f"  {label}: {inserted:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/min)")
+    return inserted
+
+
+def synthetic_password_hash(rng, password='synthetic-password', iterations=600000):
+    """Werkzeug-compatible pbkdf2 hash with a seeded salt, so the output stays deterministic"""
+    salt = '%016x' % rng.getrandbits(64)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
+    return f'pbkdf2:sha256:{iterations}${salt}${digest}'
+
+
+def generate_users(rng, count, start, span_seconds, user_created):
+    """Yield user rows; fills user_created with each user's creation timestamp"""
+    password_hash = synthetic_password_hash(rng)
+    # An affine map modulo 10^8 is a permutation, so phone numbers are unique
+    # without tracking the ones already used
+    multiplier = 48271
+    offset = rng.randrange(10 ** 8)
+
+    for user_id in range(1, count + 1):
+        created = start + rng.random() * span_seconds
+        user_created.append(created)
+        is_paid = rng.random() < 0.2
+        phone = f'+407{(user_id * multiplier + offset) % 10 ** 8:08d}'  # Already in E.164 form
+        yield (
+            user_id,
+            f'User {user_id}',
+            phone,
+            phone,
+            f'user{user_id}@example.com' if rng.random() < 0.3 else None,
+            password_hash if rng.random() < 0.4 else None,
+            'ro' if rng.random() < 0.6 else 'en',
+            datetime.utcfromtimestamp(created).strftime(TIMESTAMP_FORMAT),
+            datetime.utcfromtimestamp(created + 3 * 86400).strftime(TIMESTAMP_FORMAT),
+            is_paid,
+        )
+
+
+def generate_attempts(rng, count, users, quizzes, user_created, end):
+    """Yield quiz_progress rows with a skewed user activity and quiz popularity"""
+    quiz_ids = [quiz_id for quiz_id, _ in quizzes]
+    question_counts = dict(quizzes)
+    # Earlier quizzes in the catalog are taken more often
+    quiz_weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(quiz_ids))]
+    # Per-user skill, stable across attempts
+    skills = [min(0.95, max(0.15, rng.gauss(0.6, 0.15))) for _ in range(users)]
+
+    choose_quizzes = rng.choices
+    for attempt_id in range(1, count + 1):
+        # A small share of very active users produce most attempts
+        user_index = int(users * rng.random() ** 3)
+        quiz_id = choose_quizzes(quiz_ids, quiz_weights)[0]
+        total = question_counts[quiz_id]
+        accuracy = min(1.0, max(0.0, rng.gauss(skills[user_index], 0.1)))
+        created = user_created[user_index]
+        completed = created + rng.random() * (end - created)
+        yield (
+            attempt_id,
+            user_index + 1,
+            quiz_id,
+            int(total * accuracy),
+            total,
+            datetime.utcfromtimestamp(completed).strftime(TIMESTAMP_FORMAT),
+        )
+
+
+def build_summaries(conn):
+    """Fill user_quiz_summary from the generated attempts with set-based SQL"""
+    started = time.perf_counter()
+    conn.execute('BEGIN')
+    conn.execute('''
+        INSERT INTO user_quiz_summary
+            (user_id, quiz_id, best_score, last_score, last_total, attempt_count, last_completed_at)
+        SELECT user_id, quiz_id, best_score, score, total_questions, attempt_count, completed_at
+        FROM (
+            SELECT user_id, quiz_id, score, total_questions, completed_at,
+                   MAX(score) OVER attempts AS best_score,
+                   COUNT(*) OVER attempts AS attempt_count,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY user_id, quiz_id ORDER BY completed_at DESC, id DESC
+                   ) AS recency
+            FROM quiz_progress
+            WINDOW attempts AS (PARTITION BY user_id, quiz_id)
+        )
+        WHERE recency = 1
+    ''')
+    conn.execute('COMMIT')
+    rows = conn.execute('SELECT COUNT(*) FROM user_quiz_summary').fetchone()[0]
+    print(f"  summaries: {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic database for scale testing')
+    parser.add_argument('database', help='Path of the SQLite database to create')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--attempts', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--days', type=int, default=365, help='Time span covered by the data')
+    parser.add_argument('--no-summaries', action='store_true', help='Skip building user_quiz_summary')
+    args = parser.parse_args()
+
+    with app.app_context():
+        source_path = db.engine.url.database
+
+    rng = random.Random(args.seed)
+    # Fixed reference time so the same seed gives identical timestamps
+    end = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+    start = end - timedelta(days=args.days).total_seconds()
+
+    print("\n" + "="*60)
+    print("SYNTHETIC DATA GENERATOR")
+    print("="*60)
+    print(f"\nDatabase: {args.database}")
+    print(f"Users: {args.users:,}  Attempts: {args.attempts:,}  Seed: {args.seed}\n")
+
+    conn = open_database(args.database)
+    quizzes = copy_catalog(conn, source_path)
+    if not quizzes:
+        raise SystemExit("The app database has no quizzes - run import_quizzes.py first")
+    print(f"  catalog: {len(quizzes)} quizzes copied from {source_path}")
+
+    user_created = []
+    bulk_insert(
+        conn,
+        'INSERT INTO user (id, name, phone_number, phone_e164, email, password_hash, language, '
+        'created_at, trial_end_date, is_paid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        generate_users(rng, args.users, start, end - start, user_created),
+        'users', args.users
+    )
+    bulk_insert(
+        conn,
+        'INSERT INTO quiz_progress (id, user_id, quiz_id, score, total_questions, completed_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        generate_attempts(rng, args.attempts, args.users, quizzes, user_created, end),
+        'attempts', args.attempts
+    )
+    if not args.no_summaries:
+        build_summaries(conn)
+
+    conn.close()
+
+    print("\n" + "="*60)
+    print("GENERATION COMPLETE")
+    print("="*60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Write-behind group commit for small, frequent writes.
+Request threads hand a write (a function that changes rows through a
+session) to a per-process queue and wait on a future. A flusher thread takes
+up to `max_batch` queued writes, or whatever arrived within `max_delay` of the
+first one, applies them in one transaction and commits once. So N concurrent
+requests pay for one commit (on SQLite: one fsync and one writer lock)
+instead of N. A future resolves only after its batch has committed, which is
+the caller's durability acknowledgment.
+
+If a batch fails to commit, its writes are retried one transaction each, so
+one bad write does not fail the others.
+"""
+
+import bisect
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+
+def _no_op():
+    return None
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket counts everything above the largest bound"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given percentile (None above the last bound)"""
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'mean': round(self.sum / self.total, 3) if self.total else None,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': {
+                **{f'<={bound}': count for bound, count in zip(self.bounds, self.counts)},
+                f'>{self.bounds[-1]}': self.counts[-1]
+            }
+        }
+
+
+class GroupCommitQueue:
+    """
+    Batches writes into shared transactions.
+    `transaction` is a context manager factory that yields a session to the
+    flusher thread and rolls it back if the block raises.
+    """
+
+    def __init__(self, transaction, max_batch=64, max_delay=0.005):
+        self.transaction = transaction
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.commit_latency_ms = Histogram(LATENCY_BUCKETS_MS)  # One per batch
+        self.ack_latency_ms = Histogram(LATENCY_BUCKETS_MS)  # Submit to acknowledgment, one per write
+        self.failed_batches = 0
+
+    def submit(self, write, *args):
+        """Queue write(*args); the future resolves to its return value once committed"""
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((write, args, future, time.perf_counter()))
+        return future
+
+    def running(self):
+        """Whether this process has a live flusher thread"""
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def start(self):
+        """Start the flusher if this process has no live one; returns whether one is running"""
+        try:
+            self._ensure_thread()
+        except RuntimeError:  # No more threads can be started
+            return False
+        return self.running()
+
+    def _ensure_thread(self):
+        # Started lazily, and again after a fork (threads do not survive one)
+        if self.running():
+            return
+        with self._lock:
+            if not self.running():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # Keep the flusher alive and never leave a caller waiting on the batch
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        results = []
+        try:
+            with self.transaction() as session:
+                for write, args, _, _ in batch:
+                    results.append(write(*args))
+                session.commit()
+        except Exception:
+            with self._metrics_lock:
+                self.failed_batches += 1
+            self._flush_one_by_one(batch)
+            return
+        self._acknowledge(batch, started, results)
+
+    def _flush_one_by_one(self, batch):
+        for item in batch:
+            started = time.perf_counter()
+            write, args, future, _ = item
+            try:
+                with self.transaction() as session:
+                    result = write(*args)
+                    session.commit()
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            self._acknowledge([item], started, [result])
+
+    def _acknowledge(self, batch, started, results):
+        now = time.perf_counter()
+        with self._metrics_lock:
+            self.batch_sizes.observe(len(batch))
+            self.commit_latency_ms.observe((now - started) * 1000)
+            for _, _, _, submitted in batch:
+                self.ack_latency_ms.observe((now - submitted) * 1000)
+        for (_, _, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def drain(self, timeout=5.0):
+        """Wait until every write queued so far has been committed (e.g. at shutdown)"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        # The queue is FIFO, so once a no-op write is acknowledged everything before it is too
+        self.submit(_no_op).result(timeout)
+
+    def stats(self):
+        with self._metrics_lock:
+            return {
+                'max_batch': self.max_batch,
+                'max_delay_ms': self.max_delay * 1000,
+                'queued': self._queue.qsize(),
+                'failed_batches': self.failed_batches,
+                'batch_size': self.batch_sizes.to_dict(),
+                'commit_latency_ms': self.commit_latency_ms.to_dict(),
+                'ack_latency_ms': self.ack_latency_ms.to_dict()
+            }
@@ -1,18 +1,28 @@
 """
 Standalone script to import all quiz data from CSV files into the database.
 Run this script to populate or update the quiz database.
+
+Usage: python import_quizzes.py [--merge-duplicates within|all]
 """
 
+import argparse
+
 from app import app, db, Quiz, Question, import_all_quizzes
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import all quiz data from CSV files')
+    parser.add_argument('--merge-duplicates', choices=['within', 'all'], default=None,
+                        help='Merge near-duplicate questions within each quiz or across all quizzes')
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("QUIZ DATA IMPORT SCRIPT")
     print("="*60)
     print("\nThis script will:")
     print("  1. Find all CSV files in the csv_files folder")
     print("  2. Import all quiz questions into the database")
-    print("  3. Replace existing data with new data from CSVs")
+    print("  3. Report near-duplicate questions" + (f" and merge them ({args.merge_duplicates})" if args.merge_duplicates else ""))
+    print("  4. Replace existing data with new data from CSVs")
     print("\n" + "="*60 + "\n")
     
     input("Press Enter to start the import process...")
@@ -22,7 +32,7 @@ if __name__ == '__main__':
         db.create_all()
         
         # Run the import
-        stats = import_all_quizzes()
+        stats = import_all_quizzes(merge_duplicates=args.merge_duplicates)
         
         # Final verification
         print("\n" + "="*60)
@@ -0,0 +1,112 @@
+"""
+In-memory ranked board used to answer leaderboard queries.
+Entries are (-score, user_id) keys kept sorted in bounded chunks, with a
+Fenwick tree over the chunk lengths. Moving a user costs a binary search plus
+a shift inside one chunk, the top N is a walk over the first chunks, and a
+user's rank is a prefix sum plus a binary search.
+"""
+
+import bisect
+
+CHUNK_SIZE = 512  # Chunks are split at twice this size
+
+
+class RankedBoard:
+    """Scores of one leaderboard, highest first; ties are broken by user id"""
+
+    def __init__(self, entries=()):
+        self._scores = {}
+        keys = []
+        for user_id, score in entries:
+            self._scores[user_id] = score
+            keys.append((-score, user_id))
+        keys.sort()
+        self._chunks = [keys[i:i + CHUNK_SIZE] for i in range(0, len(keys), CHUNK_SIZE)]
+        self._reindex()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _reindex(self):
+        """Rebuild the chunk maxima and the Fenwick tree (after a chunk is split or dropped)"""
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        tree = [0] * (len(self._chunks) + 1)
+        for i, chunk in enumerate(self._chunks, 1):
+            tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add_length(self, chunk_index, delta):
+        i = chunk_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _length_before(self, chunk_index):
+        """Number of entries in the chunks before chunk_index"""
+        total = 0
+        i = chunk_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _insert(self, key):
+        if not self._chunks:
+            self._chunks = [[key]]
+            self._reindex()
+            return
+        i = min(bisect.bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        bisect.insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * CHUNK_SIZE:
+            self._chunks[i:i + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            self._reindex()
+        else:
+            self._add_length(i, 1)
+
+    def _remove(self, key):
+        i = bisect.bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect.bisect_left(chunk, key)]
+        if not chunk:
+            del self._chunks[i]
+            self._reindex()
+        else:
+            self._maxes[i] = chunk[-1]
+            self._add_length(i, -1)
+
+    def update(self, user_id, score):
+        """Set a user's score, moving the entry to its new position"""
+        old_score = self._scores.get(user_id)
+        if old_score == score:
+            return
+        if old_score is not None:
+            self._remove((-old_score, user_id))
+        self._scores[user_id] = score
+        self._insert((-score, user_id))
+
+    def score(self, user_id):
+        return self._scores.get(user_id)
+
+    def rank(self, user_id):
+        """1-based rank of a user, or None when the user is not on the board"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        key = (-score, user_id)
+        i = bisect.bisect_left(self._maxes, key)
+        return self._length_before(i) + bisect.bisect_left(self._chunks[i], key) + 1
+
+    def top(self, limit):
+        """[(rank, user_id, score)] of the best `limit` entries"""
+        top = []
+        for chunk in self._chunks:
+            for negative_score, user_id in chunk[:limit - len(top)]:
+                top.append((len(top) + 1, user_id, -negative_score))
+            if len(top) >= limit:
+                break
+        return top
@@ -0,0 +1,40 @@
+"""
+Migration for normalized phone numbers.
+Adds the User.phone_e164 column to databases created before it existed and
+fills it with the E.164 form of every user's phone number. Logins look users
+up by that column, so run this once before deploying the new code (app.py
+also runs it on startup). Safe to run again; only empty rows are filled.
+
+Usage: python migrate_phone_numbers.py
+"""
+
+from app import app, db, migrate_phone_numbers, PHONE_COUNTRY_CODE
+
+if __name__ == '__main__':
+    with app.app_context():
+        db.create_all()
+
+        print("\n" + "="*60)
+        print("PHONE NUMBER MIGRATION")
+        print("="*60)
+        print(f"\nDefault country code: +{PHONE_COUNTRY_CODE}")
+
+        stats = migrate_phone_numbers()
+
+        print(f"Column added: {'yes' if stats['column_added'] else 'no (already present)'}")
+        print(f"Numbers normalized: {stats['normalized']}")
+
+        if stats['unparseable']:
+            print(f"\n! {len(stats['unparseable'])} number(s) could not be normalized:")
+            for user_id, phone_number in stats['unparseable'][:50]:
+                print(f"  user {user_id}: {phone_number!r}")
+        if stats['conflicts']:
+            print(f"\n! {len(stats['conflicts'])} number(s) belong to another user once normalized:")
+            for user_id, phone_number, other_id in stats['conflicts'][:50]:
+                print(f"  user {user_id}: {phone_number!r} (same as user {other_id})")
+        if stats['unparseable'] or stats['conflicts']:
+            print("\nThese users cannot log in until their numbers are fixed by hand.")
+
+        print("\n" + "="*60)
+        print("MIGRATION COMPLETE")
+        print("="*60 + "\n")
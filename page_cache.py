@@ -0,0 +1,111 @@
+"""
+Bounded LRU cache of rendered page shells.
+A shell is a page rendered once with hole markers where per-user values go.
+Serving a cached page joins the shell's literal pieces with the escaped
+values instead of running the whole template through Jinja again.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import escape
+
+# JSON holes are rendered through |tojson, which wraps the marker in quotes
+HOLE_PATTERN = re.compile(r'"__page_json_(\w+)__"|__page_hole_(\w+)__')
+
+
+def text_hole(name):
+    """Marker for a value rendered as escaped text"""
+    return f'__page_hole_{name}__'
+
+
+def json_hole(name):
+    """Marker for a value rendered through |tojson"""
+    return f'__page_json_{name}__'
+
+
+def split_shell(html):
+    """Pieces of a rendered shell: ((literal, hole_name, is_json), ...); the last hole_name is None"""
+    pieces = HOLE_PATTERN.split(html)
+    parts = []
+    # split() yields literal, json hole name, text hole name, literal, ...
+    for i in range(0, len(pieces) - 1, 3):
+        literal, json_name, text_name = pieces[i:i + 3]
+        parts.append((literal, json_name or text_name, json_name is not None))
+    parts.append((pieces[-1], None, False))
+    return tuple(parts)
+
+
+class PageCache:
+    """Shells keyed by (template, ...) tuples, evicted least recently used first"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, json_dumps=json.dumps):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.json_dumps = json_dumps
+        self._shells = OrderedDict()  # key -> (parts, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._shells)
+
+    def get(self, key):
+        """Cached shell parts, or None"""
+        with self._lock:
+            entry = self._shells.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._shells.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html):
+        """Store a rendered shell; returns its parts"""
+        parts = split_shell(html)
+        size = len(html)
+        with self._lock:
+            old = self._shells.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._shells[key] = (parts, size)
+            self._bytes += size
+            while self._shells and (len(self._shells) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._shells.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return parts
+
+    def invalidate(self, template=None):
+        """Drop the shells of one template, or every shell"""
+        with self._lock:
+            if template is None:
+                self._shells.clear()
+                self._bytes = 0
+                return
+            for key in [key for key in self._shells if key[0] == template]:
+                self._bytes -= self._shells.pop(key)[1]
+
+    def fill(self, parts, values):
+        """Join the shell with the per-user values"""
+        out = []
+        for literal, name, is_json in parts:
+            out.append(literal)
+            if name is not None:
+                value = values[name]
+                out.append(htmlsafe_json_dumps(value, dumps=self.json_dumps) if is_json else escape(value))
+        return ''.join(out)
+
+    def stats(self):
+        return {
+            'entries': len(self._shells),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,66 @@
+"""
+Phone number canonicalization and a Bloom filter of registered numbers.
+Numbers are stored and looked up in E.164 form (+<country code><number>), so
+"+373 60 123 456", "0037360123456" and "060123456" are the same key. The
+Bloom filter answers "definitely not registered" without a database query;
+a positive answer still has to be confirmed by one.
+"""
+
+import hashlib
+import math
+import re
+
+DEFAULT_COUNTRY_CODE = '373'  # Moldova - the format the sign-up form enforces
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+_SEPARATORS = re.compile(r'[\s\-().]')
+
+
+def normalize_phone(raw, default_country_code=DEFAULT_COUNTRY_CODE):
+    """E.164 form of a phone number, or None when it cannot be one"""
+    if not isinstance(raw, str):
+        return None
+    number = _SEPARATORS.sub('', raw)
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]  # International call prefix
+    elif number.startswith('0'):
+        digits = default_country_code + number[1:]  # National trunk prefix
+    elif number.startswith(default_country_code) and len(number) > len(default_country_code) + 6:
+        digits = number  # Country code typed without the plus
+    else:
+        digits = default_country_code + number
+    if not digits.isdigit() or digits.startswith('0'):
+        return None
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS:
+        return None
+    return '+' + digits
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings, sized for a capacity and false positive rate"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        # Double hashing: k positions from two independent 64-bit hashes
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
@@ -0,0 +1,150 @@
+"""
+Opt-in request profiler.
+When QUIZ_PROFILE=1, the views of the allowlisted endpoints are wrapped so a
+random fraction of their requests run under cProfile while a background
+thread samples the request's stack. Profiles are aggregated per endpoint and
+written to QUIZ_PROFILE_DIR as:
+
+- <endpoint>.<pid>.pstats     - load with pstats / snakeviz
+- <endpoint>.<pid>.collapsed  - collapsed stacks for flamegraph.pl / speedscope
+
+Settings (environment):
+    QUIZ_PROFILE=1                          enable
+    QUIZ_PROFILE_RATE=0.01                  fraction of requests profiled
+    QUIZ_PROFILE_ROUTES=main_menu,get_quiz_data   endpoints (default: all)
+    QUIZ_PROFILE_DIR=profiles
+    QUIZ_PROFILE_FLUSH_EVERY=20             write files every N profiled requests
+    QUIZ_PROFILE_INTERVAL_MS=2              stack sampling interval
+
+When disabled nothing is wrapped, so there is no overhead at all.
+"""
+
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import random
+import sys
+import threading
+from collections import Counter
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's stack every `interval` seconds until stopped"""
+
+    def __init__(self, thread_id, root_code, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.root_code = root_code  # Frames above the profiled view are left out
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop_event.is_set():
+                break  # Woke up late, the view has already returned
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                if code is self.root_code:
+                    break
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class RequestProfiler:
+    """Per-endpoint aggregated cProfile stats and sampled stacks"""
+
+    def __init__(self, rate, output_dir, flush_every=20, interval=0.002):
+        self.rate = rate
+        self.output_dir = output_dir
+        self.flush_every = flush_every
+        self.interval = interval
+        self._stats = {}  # endpoint -> pstats.Stats
+        self._stacks = {}  # endpoint -> Counter
+        self._pending = Counter()  # endpoint -> profiled requests since the last write
+        self._lock = threading.Lock()
+        self._active = threading.Lock()  # Held while a request is being profiled
+
+    def wrap(self, endpoint, view):
+        @functools.wraps(view)
+        def profiled_view(*args, **kwargs):
+            if random.random() >= self.rate:
+                return view(*args, **kwargs)
+            # Only one cProfile can be active per process on Python 3.12+, so
+            # profiled requests take turns and the others run unprofiled
+            if not self._active.acquire(blocking=False):
+                return view(*args, **kwargs)
+            try:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    return view(*args, **kwargs)  # Another profiler (e.g. a debugger's) is active
+                sampler = StackSampler(threading.get_ident(), profiled_view.__code__, self.interval)
+                sampler.start()
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    profile.disable()
+                    self.record(endpoint, profile, sampler.stop())
+            finally:
+                self._active.release()
+        return profiled_view
+
+    def record(self, endpoint, profile, stacks):
+        with self._lock:
+            if endpoint in self._stats:
+                self._stats[endpoint].add(profile)
+            else:
+                self._stats[endpoint] = pstats.Stats(profile)
+            self._stacks.setdefault(endpoint, Counter()).update(stacks)
+            self._pending[endpoint] += 1
+            if self._pending[endpoint] >= self.flush_every:
+                self._write(endpoint)
+
+    def _write(self, endpoint):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f'{endpoint}.{os.getpid()}')
+        self._stats[endpoint].dump_stats(base + '.pstats')
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self._stacks[endpoint].most_common():
+                f.write(f'{stack} {count}\n')
+        self._pending[endpoint] = 0
+
+    def flush(self):
+        """Write every endpoint with unwritten samples"""
+        with self._lock:
+            for endpoint, pending in list(self._pending.items()):
+                if pending:
+                    self._write(endpoint)
+
+
+def init_profiling(app, environ=os.environ):
+    """Wrap the allowlisted views of a Flask app when profiling is enabled; returns the profiler or None"""
+    if environ.get('QUIZ_PROFILE', '0') in ('', '0'):
+        return None
+
+    profiler = RequestProfiler(
+        rate=float(environ.get('QUIZ_PROFILE_RATE', 0.01)),
+        output_dir=environ.get('QUIZ_PROFILE_DIR', 'profiles'),
+        flush_every=int(environ.get('QUIZ_PROFILE_FLUSH_EVERY', 20)),
+        interval=float(environ.get('QUIZ_PROFILE_INTERVAL_MS', 2)) / 1000
+    )
+    routes = {route.strip() for route in environ.get('QUIZ_PROFILE_ROUTES', '').split(',') if route.strip()}
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != 'static' and (not routes or endpoint in routes):
+            app.view_functions[endpoint] = profiler.wrap(endpoint, view)
+
+    atexit.register(profiler.flush)
+    return profiler
@@ -0,0 +1,114 @@
+"""
+Compiled binary question bundle, memory-mapped by every worker.
+One file per language, written by the importer:
+
+    header     '<4sHHIII'  magic, format version, reserved, catalog version,
+                           quiz count, question count
+    quizzes    '<IIII'     quiz id, first question entry, question count,
+                           reserved - sorted by quiz id
+    questions  '<IQIH2x'   question id, data offset, data length,
+                           number of correct answers - in order_num order
+    data                   UTF-8 JSON object of each question, exactly as
+                           get_quiz_data serves it
+
+Workers map the file read-only, so all processes share one copy in the page
+cache. A quiz's response is assembled by joining slices of the mapping; the
+question JSON is never decoded or re-encoded.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+
+MAGIC = b'QZB1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+QUIZ_ENTRY = struct.Struct('<IIII')
+QUESTION_ENTRY = struct.Struct('<IQIH2x')
+
+
+def write_bundle(path, catalog_version, quizzes, dumps):
+    """
+    Write a bundle atomically. `quizzes` is an iterable of (quiz_id, questions)
+    with questions in the shape served by get_quiz_data; `dumps` encodes one
+    question to a JSON string.
+    """
+    quiz_entries = []
+    question_entries = []
+    fragments = []
+    offset = 0
+    for quiz_id, questions in sorted(quizzes, key=lambda quiz: quiz[0]):
+        quiz_entries.append((quiz_id, len(question_entries), len(questions), 0))
+        for question in questions:
+            fragment = dumps(question).encode('utf-8')
+            question_entries.append((question['id'], offset, len(fragment), len(question['correct_answers'])))
+            fragments.append(fragment)
+            offset += len(fragment)
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, catalog_version, len(quiz_entries), len(question_entries)))
+        for entry in quiz_entries:
+            f.write(QUIZ_ENTRY.pack(*entry))
+        for entry in question_entries:
+            f.write(QUESTION_ENTRY.pack(*entry))
+        for fragment in fragments:
+            f.write(fragment)
+    # Readers either see the old file or the complete new one
+    os.replace(temp_path, path)
+    return {'quizzes': len(quiz_entries), 'questions': len(question_entries), 'bytes': os.path.getsize(path)}
+
+
+class QuestionBundle:
+    """Read-only view of a bundle file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.catalog_version, quiz_count, question_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a question bundle of format {FORMAT_VERSION}')
+        self._view = memoryview(self._map)
+        self._quizzes_at = HEADER.size
+        self._questions_at = self._quizzes_at + quiz_count * QUIZ_ENTRY.size
+        self._data_at = self._questions_at + question_count * QUESTION_ENTRY.size
+        # Only the quiz ids are unpacked up front, for the binary search
+        self._quiz_ids = [
+            QUIZ_ENTRY.unpack_from(self._map, self._quizzes_at + i * QUIZ_ENTRY.size)[0] for i in range(quiz_count)
+        ]
+
+    def __contains__(self, quiz_id):
+        return self._quiz_entry(quiz_id) is not None
+
+    def _quiz_entry(self, quiz_id):
+        i = bisect.bisect_left(self._quiz_ids, quiz_id)
+        if i == len(self._quiz_ids) or self._quiz_ids[i] != quiz_id:
+            return None
+        return QUIZ_ENTRY.unpack_from(self._map, self._quizzes_at + i * QUIZ_ENTRY.size)
+
+    def quiz_json(self, quiz_id, question_filter='all', shuffle=None):
+        """
+        JSON array of a quiz's questions as bytes, or None for an unknown quiz.
+        question_filter is all, single or multiple; `shuffle` (e.g.
+        random.shuffle) reorders the questions.
+        """
+        entry = self._quiz_entry(quiz_id)
+        if entry is None:
+            return None
+        _, first, count, _ = entry
+
+        view = self._view
+        data_at = self._data_at
+        slices = []
+        for i in range(first, first + count):
+            _, offset, length, answer_count = QUESTION_ENTRY.unpack_from(self._map, self._questions_at + i * QUESTION_ENTRY.size)
+            if question_filter == 'single' and answer_count != 1:
+                continue
+            if question_filter == 'multiple' and answer_count <= 1:
+                continue
+            start = data_at + offset
+            slices.append(view[start:start + length])
+        if shuffle is not None:
+            shuffle(slices)
+        return b'[' + b','.join(slices) + b']'
@@ -0,0 +1,130 @@
+"""
+Near-duplicate detection for quiz questions.
+Each question (text plus options) is reduced to a set of normalized word
+shingles and a MinHash signature. LSH banding groups signatures that are
+likely similar, so only a handful of candidate pairs are compared instead of
+every pair of questions. Candidates are confirmed with the exact Jaccard
+similarity of their shingle sets.
+"""
+
+import random
+import re
+import zlib
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 4 rows per band - pairs above ~0.5 similarity become candidates
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_PRIME = (1 << 61) - 1
+_TYPE_PREFIX = re.compile(r'^\s*(cs|cm)\s*[.:]\s*', re.IGNORECASE)  # "CS." / "CM." question type markers
+_NON_WORD = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def normalize_text(text):
+    """Lowercase, drop the question type marker and punctuation, collapse whitespace"""
+    text = _TYPE_PREFIX.sub('', text or '')
+    return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+
+
+def shingle_hashes(question_text, options):
+    """Hashed word shingles of a question and its options (option order is ignored)"""
+    parts = [normalize_text(question_text)]
+    parts.extend(sorted(normalize_text(option) for option in options if option))
+
+    hashes = set()
+    for part in parts:
+        words = part.split()
+        if len(words) <= SHINGLE_SIZE:
+            if words:
+                hashes.add(zlib.crc32(part.encode('utf-8')))
+            continue
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            hashes.add(zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8')))
+    return frozenset(hashes)
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of questions; keys are any hashable question identifiers"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_permutations=NUM_PERMUTATIONS, bands=BANDS, seed=1):
+        if num_permutations % bands:
+            raise ValueError('num_permutations must be divisible by bands')
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_permutations // bands
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_permutations)
+        ]
+        self._shingles = {}
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def signature(self, hashes):
+        if not hashes:
+            return (0,) * len(self._permutations)
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._permutations)
+
+    def add(self, key, question_text, options):
+        """Index one question"""
+        hashes = shingle_hashes(question_text, options)
+        self._shingles[key] = hashes
+        signature = self.signature(hashes)
+        for band in range(self.bands):
+            band_key = (band, signature[band * self.rows:(band + 1) * self.rows])
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def pairs(self):
+        """Yield (key_a, key_b, similarity) for confirmed near-duplicates, in insertion order"""
+        seen = set()
+        for bucket in self._buckets.values():
+            if len(bucket) < 2:
+                continue
+            for i, key_a in enumerate(bucket):
+                for key_b in bucket[i + 1:]:
+                    if (key_a, key_b) in seen:
+                        continue
+                    seen.add((key_a, key_b))
+                    similarity = jaccard(self._shingles[key_a], self._shingles[key_b])
+                    if similarity >= self.threshold:
+                        yield key_a, key_b, similarity
+
+    def clusters(self):
+        """Groups of two or more near-duplicate keys, each in insertion order"""
+        order = {key: i for i, key in enumerate(self._shingles)}
+        parent = {}
+
+        def find(key):
+            root = key
+            while parent[root] != root:
+                root = parent[root]
+            while parent[key] != root:
+                parent[key], key = root, parent[key]
+            return root
+
+        for key_a, key_b, _ in self.pairs():
+            parent.setdefault(key_a, key_a)
+            parent.setdefault(key_b, key_b)
+            root_a, root_b = find(key_a), find(key_b)
+            if root_a != root_b:
+                # Keep the earliest question as the root of its cluster
+                if order[root_b] < order[root_a]:
+                    root_a, root_b = root_b, root_a
+                parent[root_b] = root_a
+
+        groups = {}
+        for key in parent:
+            groups.setdefault(find(key), []).append(key)
+        return sorted(
+            (sorted(members, key=order.__getitem__) for members in groups.values()),
+            key=lambda members: order[members[0]]
+        )
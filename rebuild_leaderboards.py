@@ -0,0 +1,32 @@
+"""
+Full rebuild of the materialized leaderboards.
+Leaderboards are updated incrementally on every quiz submission; run this
+script periodically (e.g. nightly from cron) to repair any drift and to
+recompute the recent weekly boards.
+
+Usage: python rebuild_leaderboards.py [weeks]
+"""
+
+import sys
+
+from app import app, db, rebuild_leaderboards
+
+if __name__ == '__main__':
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    with app.app_context():
+        # Ensure the leaderboard table exists
+        db.create_all()
+
+        print("\n" + "="*60)
+        print("LEADERBOARD REBUILD")
+        print("="*60)
+
+        stats = rebuild_leaderboards(weeks=weeks)
+
+        print(f"\nAll-time quiz entries checked: {stats['quiz_entries']}")
+        print(f"Weekly boards rebuilt: {', '.join(stats['weekly_periods'])}")
+
+        print("\n" + "="*60)
+        print("REBUILD COMPLETE")
+        print("="*60 + "\n")
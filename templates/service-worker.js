@@ -0,0 +1,112 @@
+// Offline support: keeps the main menu, quiz pages and the question bundles
+// of the categories the user has opened, so a saved quiz can be taken
+// without a connection. Attempts taken offline are queued by the quiz page
+// and sent to /offline/sync once it is back.
+const CACHE_NAME = 'quiz-offline-v1';
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+function isOfflinePage(url) {
+    return url.pathname === '/main_menu' || /^\/quiz\/\d+$/.test(url.pathname);
+}
+
+function bundleUrl(category) {
+    return `/offline/bundle?category=${encodeURIComponent(category)}`;
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    if (url.pathname === '/logout') {
+        // Cached pages and questions belong to the user logging out
+        event.waitUntil(caches.delete(CACHE_NAME));
+        return;
+    }
+    if (isOfflinePage(url)) {
+        // Network first; the cached copy (any filter) is used when offline
+        event.respondWith(
+            fetch(request)
+                .then(response => {
+                    if (response.ok && !response.redirected) {
+                        const copy = response.clone();
+                        caches.open(CACHE_NAME).then(cache => cache.put(url.pathname, copy));
+                    }
+                    return response;
+                })
+                .catch(() => caches.match(url.pathname).then(cached => cached || Response.error()))
+        );
+    } else if (url.pathname === '/offline/bundle') {
+        event.respondWith(
+            fetch(request).catch(() => caches.match(request).then(cached => cached || Response.error()))
+        );
+    }
+});
+
+// Bring a category's saved bundle up to date: the first time the full bundle
+// is downloaded, afterwards only the quizzes changed since its version
+async function saveCategory(category) {
+    const cache = await caches.open(CACHE_NAME);
+    const url = bundleUrl(category);
+    const cached = await cache.match(url);
+    let bundle = cached ? await cached.json() : null;
+
+    if (bundle) {
+        const response = await fetch(
+            `/offline/delta?category=${encodeURIComponent(category)}&since=${bundle.bundle_version}`,
+            {credentials: 'same-origin'}
+        );
+        if (!response.ok) {
+            return;
+        }
+        const delta = await response.json();
+        if (delta.language !== bundle.language) {
+            bundle = null;  // The user switched language; start over
+        } else {
+            const changed = new Map(delta.quizzes.map(quiz => [quiz.id, quiz]));
+            const kept = new Map(bundle.quizzes.map(quiz => [quiz.id, quiz]));
+            bundle = Object.assign({}, delta, {
+                quizzes: delta.quiz_ids.map(id => changed.get(id) || kept.get(id)).filter(Boolean)
+            });
+        }
+    }
+    if (!bundle) {
+        const response = await fetch(url, {credentials: 'same-origin'});
+        if (!response.ok) {
+            return;
+        }
+        bundle = await response.json();
+    }
+
+    await cache.put(url, new Response(JSON.stringify(bundle), {
+        headers: {'Content-Type': 'application/json'}
+    }));
+
+    // Quiz pages of the category that were never opened are saved as well
+    await Promise.all(bundle.quiz_ids.map(async id => {
+        const page = `/quiz/${id}`;
+        if (await cache.match(page)) {
+            return;
+        }
+        const response = await fetch(page, {credentials: 'same-origin'});
+        if (response.ok && !response.redirected) {
+            await cache.put(page, response);
+        }
+    }));
+}
+
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'save-category') {
+        event.waitUntil(saveCategory(event.data.category).catch(() => {}));
+    }
+});
@@ -1,81 +1,210 @@
 """
-Verification script to confirm all quiz data is correctly imported
+Verification script to confirm all quiz data is correctly imported.
+All statistics and integrity checks are computed with a handful of grouped
+queries, so the report stays fast on large databases.
+
+Usage:
+    python verify_database.py          # human-readable report
+    python verify_database.py --json   # machine-readable report
+
+Exits with status 1 when any integrity check fails, so it can gate deploys.
 """
 
+import argparse
+import json
+import sys
+
 from app import app, db, Quiz, Question
 
-if __name__ == '__main__':
-    with app.app_context():
-        print("\n" + "="*70)
-        print("DATABASE VERIFICATION REPORT")
-        print("="*70 + "\n")
-        
-        # Overall stats
-        total_quizzes = Quiz.query.count()
-        total_questions = Question.query.count()
-        
-        print(f"OVERALL STATISTICS:")
-        print(f"  Total Quizzes: {total_quizzes}")
-        print(f"  Total Questions: {total_questions}")
+OPTION_LETTERS = ['A', 'B', 'C', 'D', 'E']
+EXAMPLE_LIMIT = 10  # Question ids listed per failing check
+
+
+def is_blank(column):
+    return (column == None) | (db.func.trim(column) == '')
+
+
+def count_if(condition):
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+
+def question_conditions():
+    """Per-question integrity conditions, keyed by check name"""
+    answers = Question.correct_answers
+    return {
+        'missing_required_options': is_blank(Question.option_a) | is_blank(Question.option_b),
+        # Only letters A-E separated by single commas are valid
+        'malformed_correct_answers': (
+            is_blank(answers)
+            | answers.op('GLOB')('*[^A-E,]*')
+            | answers.like(',%')
+            | answers.like('%,')
+            | answers.like('%,,%')
+        ),
+        'answers_reference_empty_option': db.or_(*[
+            answers.contains(letter) & is_blank(getattr(Question, f'option_{letter.lower()}'))
+            for letter in OPTION_LETTERS
+        ]),
+    }
+
+
+def collect_report():
+    """Build the full statistics and integrity report as a dict"""
+    conditions = question_conditions()
+
+    # Per-quiz statistics in one grouped query
+    quiz_rows = db.session.query(
+        Quiz.id,
+        Quiz.title,
+        Quiz.category,
+        db.func.count(Question.id),
+        count_if(Question.correct_answers.contains(','))
+    ).outerjoin(Question, Question.quiz_id == Quiz.id).group_by(Quiz.id).order_by(Quiz.id).all()
+
+    categories = {}
+    for quiz_id, title, category, question_count, multiple in quiz_rows:
+        if not category:
+            continue
+        entry = categories.setdefault(category, {'quizzes': [], 'questions': 0})
+        entry['questions'] += question_count
+        entry['quizzes'].append({
+            'id': quiz_id,
+            'title': title,
+            'questions': question_count,
+            'single_answer': question_count - multiple,
+            'multiple_answer': multiple
+        })
+
+    # All per-question checks in a single scan of the question table
+    check_counts = db.session.query(
+        db.func.count(Question.id),
+        *[count_if(condition) for condition in conditions.values()]
+    ).one()
+    total_questions = check_counts[0]
+
+    orphaned = db.session.query(db.func.count(Question.id)).outerjoin(
+        Quiz, Question.quiz_id == Quiz.id
+    ).filter(Quiz.id == None).scalar()
+
+    # Exact duplicates (same normalized text) within the same quiz
+    normalized_text = db.func.lower(db.func.trim(Question.question_text))
+    duplicate_groups = db.session.query(
+        Question.quiz_id,
+        db.func.count(Question.id)
+    ).group_by(Question.quiz_id, normalized_text).having(db.func.count(Question.id) > 1).subquery()
+    duplicate_group_count, duplicate_extra = db.session.query(
+        db.func.count(),
+        db.func.coalesce(db.func.sum(duplicate_groups.c[1] - 1), 0)
+    ).select_from(duplicate_groups).one()
+
+    # Same text appearing in more than one quiz - reported, not a failure
+    cross_quiz_duplicates = db.session.query(db.func.count()).select_from(
+        db.session.query(normalized_text).group_by(normalized_text)
+        .having(db.func.count(db.distinct(Question.quiz_id)) > 1).subquery()
+    ).scalar()
+
+    empty_quizzes = [
+        {'id': quiz_id, 'title': title}
+        for quiz_id, title, _, question_count, _ in quiz_rows if question_count == 0
+    ]
+
+    checks = {
+        'empty_quizzes': {'count': len(empty_quizzes), 'quizzes': empty_quizzes},
+        'orphaned_questions': {'count': orphaned},
+        'duplicate_questions': {'count': duplicate_extra, 'groups': duplicate_group_count},
+    }
+    for name, count in zip(conditions, check_counts[1:]):
+        checks[name] = {'count': count}
+        if count:
+            checks[name]['examples'] = [
+                question_id for (question_id,) in
+                db.session.query(Question.id).filter(conditions[name]).order_by(Question.id).limit(EXAMPLE_LIMIT)
+            ]
+
+    return {
+        'total_quizzes': len(quiz_rows),
+        'total_questions': total_questions,
+        'categories': categories,
+        'cross_quiz_duplicate_texts': cross_quiz_duplicates,
+        'checks': checks,
+        'passed': all(check['count'] == 0 for check in checks.values())
+    }
+
+
+CHECK_LABELS = {
+    'empty_quizzes': ('All quizzes have questions', 'quizzes with no questions'),
+    'orphaned_questions': ('No orphaned questions', 'orphaned questions'),
+    'duplicate_questions': ('No duplicate questions within a quiz', 'duplicate questions within quizzes'),
+    'missing_required_options': ('All questions have required options', 'questions with missing required options'),
+    'malformed_correct_answers': ('All correct answers are well-formed', 'questions with malformed correct answers'),
+    'answers_reference_empty_option': ('No answers reference empty options', 'questions whose answers reference empty options'),
+}
+
+
+def print_report(report):
+    print("\n" + "="*70)
+    print("DATABASE VERIFICATION REPORT")
+    print("="*70 + "\n")
+
+    total_quizzes = report['total_quizzes']
+    total_questions = report['total_questions']
+    print(f"OVERALL STATISTICS:")
+    print(f"  Total Quizzes: {total_quizzes}")
+    print(f"  Total Questions: {total_questions}")
+    if total_quizzes:
         print(f"  Average Questions per Quiz: {total_questions / total_quizzes:.1f}")
-        
-        # By category
-        print(f"\n{'='*70}")
-        print("QUIZZES BY CATEGORY:")
-        print("="*70)
-        
-        categories = db.session.query(Quiz.category).distinct().all()
-        for (category,) in categories:
-            if category:
-                quizzes = Quiz.query.filter_by(category=category).all()
-                total_q = sum(len(q.questions) for q in quizzes)
-                
-                print(f"\n{category} ({len(quizzes)} quizzes, {total_q} questions):")
-                for quiz in quizzes:
-                    single_answer = sum(1 for q in quiz.questions if ',' not in q.correct_answers)
-                    multiple_answer = sum(1 for q in quiz.questions if ',' in q.correct_answers)
-                    print(f"  - {quiz.title}: {len(quiz.questions)} questions")
-                    print(f"      (Single: {single_answer}, Multiple: {multiple_answer})")
-        
-        # Check for issues
-        print(f"\n{'='*70}")
-        print("INTEGRITY CHECKS:")
-        print("="*70)
-        
-        issues = []
-        
-        # Check for quizzes without questions
-        empty_quizzes = Quiz.query.filter(~Quiz.questions.any()).all()
-        if empty_quizzes:
-            issues.append(f"Found {len(empty_quizzes)} quizzes with no questions")
-        else:
-            print("  - All quizzes have questions: OK")
-        
-        # Check for orphaned questions
-        orphaned = Question.query.filter(~Question.quiz.has()).count()
-        if orphaned > 0:
-            issues.append(f"Found {orphaned} orphaned questions")
-        else:
-            print("  - No orphaned questions: OK")
-        
-        # Check for questions with missing options
-        incomplete = Question.query.filter(
-            (Question.option_a == None) | 
-            (Question.option_b == None)
-        ).count()
-        if incomplete > 0:
-            issues.append(f"Found {incomplete} questions with missing required options")
-        else:
-            print("  - All questions have required options: OK")
-        
-        if issues:
-            print(f"\n  ISSUES FOUND:")
-            for issue in issues:
-                print(f"    ! {issue}")
+    print(f"  Question texts shared across quizzes: {report['cross_quiz_duplicate_texts']}")
+
+    # By category
+    print(f"\n{'='*70}")
+    print("QUIZZES BY CATEGORY:")
+    print("="*70)
+
+    for category, entry in report['categories'].items():
+        print(f"\n{category} ({len(entry['quizzes'])} quizzes, {entry['questions']} questions):")
+        for quiz in entry['quizzes']:
+            print(f"  - {quiz['title']}: {quiz['questions']} questions")
+            print(f"      (Single: {quiz['single_answer']}, Multiple: {quiz['multiple_answer']})")
+
+    # Integrity checks
+    print(f"\n{'='*70}")
+    print("INTEGRITY CHECKS:")
+    print("="*70)
+
+    issues = []
+    for name, check in report['checks'].items():
+        ok_label, issue_label = CHECK_LABELS[name]
+        if check['count']:
+            issue = f"Found {check['count']} {issue_label}"
+            if check.get('examples'):
+                issue += f" (e.g. question ids {', '.join(map(str, check['examples']))})"
+            issues.append(issue)
         else:
-            print("\n  ALL CHECKS PASSED!")
-        
-        print(f"\n{'='*70}")
-        print("VERIFICATION COMPLETE")
-        print("="*70 + "\n")
+            print(f"  - {ok_label}: OK")
+
+    if issues:
+        print(f"\n  ISSUES FOUND:")
+        for issue in issues:
+            print(f"    ! {issue}")
+    else:
+        print("\n  ALL CHECKS PASSED!")
+
+    print(f"\n{'='*70}")
+    print("VERIFICATION COMPLETE")
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verify imported quiz data')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    with app.app_context():
+        report = collect_report()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
 
+    sys.exit(0 if report['passed'] else 1)